@@ -1,9 +1,17 @@
 """
 Configuration management for Proxmox CSI Driver
 """
+import os
+import copy
 import yaml
+from collections import OrderedDict
 from dataclasses import dataclass
-from typing import List
+from typing import List, Tuple
+
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:
+    from yaml import SafeLoader as _Loader
 
 
 @dataclass
@@ -22,6 +30,11 @@ class CSIConfig:
     clusters: List[ProxmoxCluster]
 
 
+# Parsed configs keyed by absolute path, validated by (mtime_ns, size)
+_CONFIG_CACHE_SIZE = 16
+_config_cache: "OrderedDict[str, Tuple[int, int, CSIConfig]]" = OrderedDict()
+
+
 def load_config(config_path: str) -> CSIConfig:
     """
     Load configuration from YAML file
@@ -40,8 +53,28 @@ def load_config(config_path: str) -> CSIConfig:
             region: "cluster-1"
             insecure: false
     """
+    path = os.path.abspath(config_path)
+    st = os.stat(path)
+
+    cached = _config_cache.get(path)
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        _config_cache.move_to_end(path)
+        return copy.deepcopy(cached[2])
+
+    config = _parse_config(path)
+
+    _config_cache[path] = (st.st_mtime_ns, st.st_size, config)
+    _config_cache.move_to_end(path)
+    while len(_config_cache) > _CONFIG_CACHE_SIZE:
+        _config_cache.popitem(last=False)
+
+    return copy.deepcopy(config)
+
+
+def _parse_config(config_path: str) -> CSIConfig:
+    """Read and parse YAML configuration file"""
     with open(config_path, 'r') as f:
-        data = yaml.safe_load(f)
+        data = yaml.load(f, Loader=_Loader)
 
     clusters = []
     for cluster_data in data.get('clusters', []):
@@ -58,3 +91,11 @@ def load_config(config_path: str) -> CSIConfig:
         raise ValueError("No clusters configured")
 
     return CSIConfig(clusters=clusters)
+
+
+def _cache_clear():
+    """Drop all cached configurations"""
+    _config_cache.clear()
+
+
+load_config.cache_clear = _cache_clear
@@ -29,9 +29,14 @@ DEFAULT_FS_TYPE = FS_TYPE_EXT4
 
 # Device discovery
 SCSI_DEVICES_PATH = "/sys/bus/scsi/devices"
+DISK_BY_ID_PATH = "/dev/disk/by-id"
 DEVICE_DISCOVERY_TIMEOUT = 10  # seconds
 DEVICE_DISCOVERY_INTERVAL = 0.05  # 50ms
 
+# gRPC server worker threads (overridable via CSI_GRPC_WORKERS)
+CONTROLLER_GRPC_WORKERS = 16
+NODE_GRPC_WORKERS = 16
+
 # Volume capabilities
 MAX_VOLUMES_PER_NODE = 29  # Matches LUN range 1-29 (QEMU 30 SCSI limit, LUN 0 avoided)
 
@@ -5,7 +5,18 @@ import os
 import time
 import logging
 from typing import Optional
-from ..constants import SCSI_DEVICES_PATH, DEVICE_DISCOVERY_TIMEOUT, DEVICE_DISCOVERY_INTERVAL
+from ..constants import (
+    SCSI_DEVICES_PATH,
+    DISK_BY_ID_PATH,
+    DEVICE_DISCOVERY_TIMEOUT,
+    DEVICE_DISCOVERY_INTERVAL
+)
+from ..filesystem.mount import get_mounts
+
+try:
+    import pyudev
+except ImportError:
+    pyudev = None
 
 
 logger = logging.getLogger(__name__)
@@ -15,8 +26,10 @@ def discover_device_by_wwn(wwn: str, timeout: int = DEVICE_DISCOVERY_TIMEOUT) ->
     """
     Discover block device by WWN identifier
 
-    Scans /sys/bus/scsi/devices for matching WWN.
-    Retries for specified timeout with short intervals.
+    Resolves the udev /dev/disk/by-id/wwn-0x<wwn> symlink first and falls
+    back to scanning /sys/bus/scsi/devices for matching WWN.
+    If the device is not present yet, waits for udev block "add" events
+    (via pyudev), or polls with short intervals when pyudev is unavailable.
 
     Args:
         wwn: WWN hex string (without 0x prefix)
@@ -30,17 +43,118 @@ def discover_device_by_wwn(wwn: str, timeout: int = DEVICE_DISCOVERY_TIMEOUT) ->
     """
     logger.info(f"Discovering device with WWN {wwn}")
 
-    max_retries = int(timeout / DEVICE_DISCOVERY_INTERVAL)
+    deadline = time.monotonic() + timeout
+
+    # Start listening before the first scan so no uevent is missed in between
+    monitor = _start_udev_monitor()
+
+    device_path = _find_device(wwn)
+    if not device_path:
+        if monitor is not None:
+            device_path = _wait_for_udev(monitor, wwn, deadline)
+        else:
+            device_path = _poll_for_device(wwn, deadline)
+
+    if device_path:
+        logger.info(f"Device found: {device_path} for WWN {wwn}")
+        return device_path
+
+    raise Exception(f"Device with WWN {wwn} not found after {timeout}s")
+
+
+def _find_device(wwn: str) -> Optional[str]:
+    """Single lookup attempt: by-id symlink, then sysfs scan"""
+    return resolve_wwn_symlink(wwn) or scan_scsi_devices_for_wwn(wwn)
+
+
+def _start_udev_monitor():
+    """Start a udev monitor for block devices, or None if unavailable"""
+    if pyudev is None:
+        return None
+
+    try:
+        monitor = pyudev.Monitor.from_netlink(pyudev.Context())
+        monitor.filter_by('block')
+        monitor.start()
+        return monitor
+    except Exception as e:
+        logger.debug(f"udev monitor unavailable, falling back to polling: {e}")
+        return None
+
+
+def _wait_for_udev(monitor, wwn: str, deadline: float) -> Optional[str]:
+    """Wait for a udev block device event matching WWN until deadline"""
+    expected = f'0x{wwn.lower()}'
+
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+
+        device = monitor.poll(timeout=remaining)
+        if device is None:
+            break
+        if device.action not in ('add', 'change'):
+            continue
+
+        if device.properties.get('ID_WWN', '').lower() == expected and device.device_node:
+            return device.device_node
 
-    for attempt in range(max_retries):
-        device_path = scan_scsi_devices_for_wwn(wwn)
+        # Event properties may not carry ID_WWN; re-check by symlink/sysfs
+        device_path = _find_device(wwn)
         if device_path:
-            logger.info(f"Device found: {device_path} for WWN {wwn}")
             return device_path
 
+    # Final attempt in case the event was missed
+    return _find_device(wwn)
+
+
+def _poll_for_device(wwn: str, deadline: float) -> Optional[str]:
+    """Poll for device matching WWN until deadline"""
+    while time.monotonic() < deadline:
         time.sleep(DEVICE_DISCOVERY_INTERVAL)
+        device_path = _find_device(wwn)
+        if device_path:
+            return device_path
 
-    raise Exception(f"Device with WWN {wwn} not found after {timeout}s")
+    return None
+
+
+def resolve_wwn_symlink(wwn: str) -> Optional[str]:
+    """
+    Resolve device via udev by-id WWN symlink
+
+    Args:
+        wwn: WWN hex string (without 0x prefix)
+
+    Returns:
+        Device path if the symlink exists, None otherwise
+    """
+    link = os.path.join(DISK_BY_ID_PATH, f'wwn-0x{wwn.lower()}')
+    try:
+        target = os.readlink(link)
+    except OSError:
+        return None
+
+    device_path = os.path.realpath(os.path.join(DISK_BY_ID_PATH, target))
+    if not device_path.startswith('/dev/'):
+        return None
+
+    return device_path
+
+
+def _read_sysfs(path: str, size: int = 128) -> Optional[bytes]:
+    """Read a small sysfs attribute as raw bytes without a Python file object"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        return os.read(fd, size).strip()
+    except OSError:
+        return None
+    finally:
+        os.close(fd)
 
 
 def scan_scsi_devices_for_wwn(target_wwn: str) -> Optional[str]:
@@ -53,46 +167,32 @@ def scan_scsi_devices_for_wwn(target_wwn: str) -> Optional[str]:
     Returns:
         Device path if found, None otherwise
     """
-    if not os.path.exists(SCSI_DEVICES_PATH):
-        return None
+    expected = b'naa.' + target_wwn.lower().encode()
 
     try:
-        for device_dir in os.listdir(SCSI_DEVICES_PATH):
-            device_path = os.path.join(SCSI_DEVICES_PATH, device_dir)
-
-            # Check if this is a QEMU device
-            vendor_file = os.path.join(device_path, 'vendor')
-            if os.path.exists(vendor_file):
-                try:
-                    with open(vendor_file, 'r') as f:
-                        vendor = f.read().strip()
-                        if vendor.upper() != 'QEMU':
-                            continue
-                except:
-                    continue
+        with os.scandir(SCSI_DEVICES_PATH) as entries:
+            for entry in entries:
+                device_path = entry.path
 
-            # Check WWN matches
-            wwid_file = os.path.join(device_path, 'wwid')
-            if os.path.exists(wwid_file):
-                try:
-                    with open(wwid_file, 'r') as f:
-                        wwid = f.read().strip()
-                        if not wwid.startswith('naa.'):
-                            continue
-
-                        # Extract WWN (remove 'naa.' prefix)
-                        wwn = wwid[4:]
-                        if wwn == target_wwn:
-                            # Found matching device, get block device name
-                            block_dir = os.path.join(device_path, 'block')
-                            if os.path.exists(block_dir):
-                                block_devices = os.listdir(block_dir)
-                                if block_devices:
-                                    return f'/dev/{block_devices[0]}'
-                except:
+                # Check if this is a QEMU device
+                vendor = _read_sysfs(os.path.join(device_path, 'vendor'))
+                if vendor is not None and vendor.upper() != b'QEMU':
                     continue
 
-    except Exception as e:
+                # Check WWN matches (wwid is "naa.<wwn>")
+                wwid = _read_sysfs(os.path.join(device_path, 'wwid'), 64)
+                if wwid is not None and wwid.lower() == expected:
+                    # Found matching device, get block device name
+                    try:
+                        block_devices = os.listdir(os.path.join(device_path, 'block'))
+                    except OSError:
+                        continue
+                    if block_devices:
+                        return f'/dev/{block_devices[0]}'
+
+    except FileNotFoundError:
+        return None
+    except OSError as e:
         logger.error(f"Error scanning SCSI devices: {e}")
 
     return None
@@ -109,12 +209,8 @@ def get_device_from_mount(mount_path: str) -> Optional[str]:
         Device path or None
     """
     try:
-        with open('/proc/mounts', 'r') as f:
-            for line in f:
-                parts = line.split()
-                if len(parts) >= 2 and parts[1] == mount_path:
-                    return parts[0]
-    except Exception as e:
-        logger.error(f"Error reading /proc/mounts: {e}")
+        return get_mounts().get(mount_path)
+    except OSError as e:
+        logger.error(f"Error reading mount table: {e}")
 
     return None
@@ -3,18 +3,39 @@ Filesystem formatting utilities
 """
 import subprocess
 import logging
-from typing import Optional, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, List, Tuple
 from ..constants import FS_TYPE_EXT4, FS_TYPE_XFS
 
 
 logger = logging.getLogger(__name__)
 
+# mkfs base command and option formatters per filesystem type
+_MKFS_SPECS = {
+    FS_TYPE_EXT4: (
+        ['mkfs.ext4', '-F'],
+        {
+            'block_size': lambda v: ['-b', str(v)],
+            'inode_size': lambda v: ['-I', str(v)],
+        }
+    ),
+    FS_TYPE_XFS: (
+        ['mkfs.xfs', '-f'],
+        {
+            'block_size': lambda v: ['-b', f"size={v}"],
+            'inode_size': lambda v: ['-i', f"size={v}"],
+        }
+    ),
+}
+
 
 def format_device(device_path: str, fstype: str = FS_TYPE_EXT4,
                  options: Optional[Dict] = None) -> bool:
     """
     Format block device with specified filesystem
 
+    Skips mkfs if the device already carries the requested filesystem.
+
     Args:
         device_path: Device path (e.g., /dev/sda)
         fstype: Filesystem type (ext4 or xfs)
@@ -24,32 +45,33 @@ def format_device(device_path: str, fstype: str = FS_TYPE_EXT4,
         True if successful
 
     Raises:
-        Exception: If formatting fails
+        Exception: If formatting fails or device has a different filesystem
     """
+    spec = _MKFS_SPECS.get(fstype)
+    if spec is None:
+        raise ValueError(f"Unsupported filesystem type: {fstype}")
+
+    existing = check_filesystem(device_path)
+    if existing == fstype:
+        logger.info(f"Device {device_path} already formatted as {fstype}")
+        return True
+    if existing:
+        raise Exception(
+            f"Device {device_path} already has {existing} filesystem, refusing to format as {fstype}"
+        )
+
     logger.info(f"Formatting {device_path} as {fstype}")
 
-    if fstype == FS_TYPE_EXT4:
-        cmd = ['mkfs.ext4', '-F']
-        if options:
-            if 'block_size' in options:
-                cmd.extend(['-b', str(options['block_size'])])
-            if 'inode_size' in options:
-                cmd.extend(['-I', str(options['inode_size'])])
-        cmd.append(device_path)
-
-    elif fstype == FS_TYPE_XFS:
-        cmd = ['mkfs.xfs', '-f']
-        if options:
-            if 'block_size' in options:
-                cmd.extend(['-b', f"size={options['block_size']}"])
-            if 'inode_size' in options:
-                cmd.extend(['-i', f"size={options['inode_size']}"])
-        cmd.append(device_path)
-
-    else:
-        raise ValueError(f"Unsupported filesystem type: {fstype}")
+    base_cmd, formatters = spec
+    cmd = list(base_cmd)
+    if options:
+        for key, formatter in formatters.items():
+            if key in options:
+                cmd.extend(formatter(options[key]))
+    cmd.append(device_path)
 
-    logger.debug(f"Format command: {' '.join(cmd)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Format command: %s", ' '.join(cmd))
 
     result = subprocess.run(cmd, capture_output=True, text=True)
     if result.returncode != 0:
@@ -59,6 +81,29 @@ def format_device(device_path: str, fstype: str = FS_TYPE_EXT4,
     return True
 
 
+def format_devices(specs: List[Tuple[str, str, Optional[Dict]]]) -> List[bool]:
+    """
+    Format multiple block devices concurrently
+
+    mkfs is I/O bound per device, so independent devices are formatted in
+    parallel and total latency is bounded by the slowest device.
+
+    Args:
+        specs: List of (device_path, fstype, options) tuples
+
+    Returns:
+        List of results in the same order as specs
+
+    Raises:
+        Exception: If formatting any device fails
+    """
+    if not specs:
+        return []
+
+    with ThreadPoolExecutor(max_workers=min(8, len(specs))) as executor:
+        return list(executor.map(lambda spec: format_device(*spec), specs))
+
+
 def check_filesystem(device_path: str) -> Optional[str]:
     """
     Check if device has a filesystem and return type
@@ -76,8 +121,9 @@ def check_filesystem(device_path: str) -> Optional[str]:
             text=True
         )
         if result.returncode == 0:
-            return result.stdout.strip()
+            return result.stdout.strip() or None
     except Exception as e:
         logger.debug(f"Error checking filesystem on {device_path}: {e}")
 
     return None
+
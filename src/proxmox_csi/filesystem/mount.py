@@ -2,13 +2,199 @@
 Mount/unmount operations
 """
 import os
+import re
+import ctypes
+import ctypes.util
+import select
 import subprocess
 import logging
-from typing import Optional, List
+import threading
+from typing import Optional, List, Dict, Tuple
+from ..constants import FS_TYPE_EXT4, FS_TYPE_XFS
 
 
 logger = logging.getLogger(__name__)
 
+PROC_MOUNTS_PATH = '/proc/self/mounts'
+
+# Parsed mount table {target_path: device}, rebuilt only when the kernel
+# signals a mount table change. /proc/self/mounts mtime does not change on
+# mount/umount, but the open file reports POLLPRI after every change.
+_mounts_lock = threading.Lock()
+_mounts_fd: Optional[int] = None
+_mounts_poller: Optional[select.poll] = None
+_mounts_cache: Optional[Dict[str, str]] = None
+
+# First two fields (device, target) of each /proc/mounts line
+_MOUNT_RE = re.compile(rb'^(\S+)[ \t]+(\S+)', re.MULTILINE)
+
+# Octal escapes used by the kernel for space, tab, newline and backslash
+_MOUNT_ESCAPE_RE = re.compile(rb'\\([0-7]{3})')
+
+
+def _unescape_mount_field(field: bytes) -> str:
+    """Decode octal escapes (e.g. \\040) in a /proc/mounts field"""
+    if b'\\' in field:
+        field = _MOUNT_ESCAPE_RE.sub(lambda m: bytes((int(m.group(1), 8),)), field)
+    return field.decode('utf-8', 'replace')
+
+
+def get_mounts() -> Dict[str, str]:
+    """
+    Get current mount table
+
+    Returns:
+        Dictionary mapping mount target paths to devices
+    """
+    global _mounts_fd, _mounts_poller, _mounts_cache
+
+    with _mounts_lock:
+        if _mounts_fd is None:
+            _mounts_fd = os.open(PROC_MOUNTS_PATH, os.O_RDONLY)
+            _mounts_poller = select.poll()
+            _mounts_poller.register(_mounts_fd, select.POLLPRI)
+        elif _mounts_cache is not None and not _mounts_poller.poll(0):
+            return _mounts_cache
+
+        # The poll above already consumed the change notification (the
+        # kernel re-arms it in mounts_poll, not on read); just re-read
+        os.lseek(_mounts_fd, 0, os.SEEK_SET)
+        chunks = []
+        while True:
+            chunk = os.read(_mounts_fd, 1 << 20)
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+        mounts = {}
+        for match in _MOUNT_RE.finditer(b''.join(chunks)):
+            device, target = match.groups()
+            mounts[_unescape_mount_field(target)] = _unescape_mount_field(device)
+
+        _mounts_cache = mounts
+        return mounts
+
+
+# mount(2) flags (linux/mount.h)
+MS_RDONLY = 0x1
+MS_NOSUID = 0x2
+MS_NODEV = 0x4
+MS_NOEXEC = 0x8
+MS_SYNCHRONOUS = 0x10
+MS_REMOUNT = 0x20
+MS_MANDLOCK = 0x40
+MS_DIRSYNC = 0x80
+MS_NOATIME = 0x400
+MS_NODIRATIME = 0x800
+MS_BIND = 0x1000
+MS_SILENT = 0x8000
+MS_RELATIME = 0x200000
+MS_I_VERSION = 0x800000
+MS_STRICTATIME = 0x1000000
+MS_LAZYTIME = 0x2000000
+
+# VFS mount options as (flags to set, flags to clear), following mount(8);
+# the positive forms of the no* options clear the flag again
+_MOUNT_OPTION_FLAGS = {
+    'rw': (0, MS_RDONLY),
+    'ro': (MS_RDONLY, 0),
+    'suid': (0, MS_NOSUID),
+    'nosuid': (MS_NOSUID, 0),
+    'dev': (0, MS_NODEV),
+    'nodev': (MS_NODEV, 0),
+    'exec': (0, MS_NOEXEC),
+    'noexec': (MS_NOEXEC, 0),
+    'sync': (MS_SYNCHRONOUS, 0),
+    'async': (0, MS_SYNCHRONOUS),
+    'dirsync': (MS_DIRSYNC, 0),
+    'mand': (MS_MANDLOCK, 0),
+    'nomand': (0, MS_MANDLOCK),
+    'remount': (MS_REMOUNT, 0),
+    'bind': (MS_BIND, 0),
+    'atime': (0, MS_NOATIME),
+    'noatime': (MS_NOATIME, 0),
+    'diratime': (0, MS_NODIRATIME),
+    'nodiratime': (MS_NODIRATIME, 0),
+    'relatime': (MS_RELATIME, 0),
+    'norelatime': (0, MS_RELATIME),
+    'strictatime': (MS_STRICTATIME, 0),
+    'nostrictatime': (0, MS_STRICTATIME),
+    'lazytime': (MS_LAZYTIME, 0),
+    'nolazytime': (0, MS_LAZYTIME),
+    'iversion': (MS_I_VERSION, 0),
+    'noiversion': (0, MS_I_VERSION),
+    'silent': (MS_SILENT, 0),
+    'loud': (0, MS_SILENT),
+}
+
+# Options only mount(8) and fstab tools act on; the kernel rejects them
+_USERSPACE_OPTIONS = frozenset({
+    'defaults', 'auto', 'noauto', 'nofail', '_netdev',
+    'user', 'nouser', 'users', 'owner', 'group',
+})
+_USERSPACE_OPTION_PREFIXES = ('x-', 'comment=')
+
+# Filesystems mounted with mount(2) directly; anything else goes through
+# mount(8) since it may need a helper binary (e.g. mount.nfs)
+_SYSCALL_FSTYPES = frozenset({FS_TYPE_EXT4, FS_TYPE_XFS})
+
+
+def _load_libc():
+    """Load libc with mount/umount2 prototypes, or None if unavailable"""
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.mount.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_char_p,
+                               ctypes.c_ulong, ctypes.c_char_p]
+        libc.mount.restype = ctypes.c_int
+        libc.umount2.argtypes = [ctypes.c_char_p, ctypes.c_int]
+        libc.umount2.restype = ctypes.c_int
+        return libc
+    except (OSError, AttributeError) as e:
+        logger.debug(f"libc mount(2) unavailable, using mount(8): {e}")
+        return None
+
+
+_libc = _load_libc()
+
+
+def _parse_mount_options(options: Optional[List[str]]) -> Tuple[int, Optional[str]]:
+    """Split mount options into mount(2) flags and filesystem data string"""
+    flags = 0
+    data = []
+    for option in options or []:
+        if option in _USERSPACE_OPTIONS or option.startswith(_USERSPACE_OPTION_PREFIXES):
+            continue
+        flag = _MOUNT_OPTION_FLAGS.get(option)
+        if flag is None:
+            # Filesystem-specific, e.g. discard or errors=remount-ro
+            data.append(option)
+        else:
+            set_flags, clear_flags = flag
+            flags = (flags & ~clear_flags) | set_flags
+    return flags, ','.join(data) if data else None
+
+
+def _sys_mount(source: str, target: str, fstype: Optional[str], flags: int,
+               data: Optional[str] = None):
+    """Call mount(2), raising OSError on failure"""
+    ret = _libc.mount(
+        os.fsencode(source),
+        os.fsencode(target),
+        fstype.encode() if fstype else None,
+        flags,
+        data.encode() if data else None
+    )
+    if ret != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno), target)
+
+
+def _sys_umount(target: str, flags: int = 0):
+    """Call umount2(2), raising OSError on failure"""
+    if _libc.umount2(os.fsencode(target), flags) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno), target)
+
 
 def mount_device(device_path: str, target_path: str, fstype: str = 'ext4',
                 options: Optional[List[str]] = None) -> bool:
@@ -32,6 +218,16 @@ def mount_device(device_path: str, target_path: str, fstype: str = 'ext4',
     # Create target directory if not exists
     os.makedirs(target_path, exist_ok=True)
 
+    if _libc is not None and fstype in _SYSCALL_FSTYPES:
+        flags, data = _parse_mount_options(options)
+        try:
+            _sys_mount(device_path, target_path, fstype, flags, data)
+        except OSError as e:
+            raise Exception(f"Failed to mount {device_path}: {e}")
+
+        logger.info(f"Device {device_path} mounted successfully")
+        return True
+
     # Build mount command
     cmd = ['mount']
     if fstype:
@@ -40,22 +236,24 @@ def mount_device(device_path: str, target_path: str, fstype: str = 'ext4',
         cmd.extend(['-o', ','.join(options)])
     cmd.extend([device_path, target_path])
 
-    logger.debug(f"Mount command: {' '.join(cmd)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Mount command: %s", ' '.join(cmd))
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
     if result.returncode != 0:
-        raise Exception(f"Failed to mount {device_path}: {result.stderr}")
+        raise Exception(f"Failed to mount {device_path}: {result.stderr.decode(errors='replace')}")
 
     logger.info(f"Device {device_path} mounted successfully")
     return True
 
 
-def unmount_path(target_path: str) -> bool:
+def unmount_path(target_path: str, trim: bool = False) -> bool:
     """
     Unmount target path
 
     Args:
         target_path: Path to unmount
+        trim: Run fstrim before unmounting to release unused blocks
 
     Returns:
         True if successful
@@ -66,17 +264,25 @@ def unmount_path(target_path: str) -> bool:
     logger.info(f"Unmounting {target_path}")
 
     # Run fstrim before unmount (ignore errors)
-    try:
-        subprocess.run(['fstrim', '-v', target_path],
-                      capture_output=True, check=False, timeout=30)
-    except Exception as e:
-        logger.debug(f"fstrim failed (ignored): {e}")
+    if trim:
+        try:
+            subprocess.run(['fstrim', target_path],
+                          stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                          check=False, timeout=30)
+        except Exception as e:
+            logger.debug(f"fstrim failed (ignored): {e}")
 
     # Unmount
-    result = subprocess.run(['umount', target_path],
-                           capture_output=True, text=True)
-    if result.returncode != 0:
-        raise Exception(f"Failed to unmount {target_path}: {result.stderr}")
+    if _libc is not None:
+        try:
+            _sys_umount(target_path)
+        except OSError as e:
+            raise Exception(f"Failed to unmount {target_path}: {e}")
+    else:
+        result = subprocess.run(['umount', target_path],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        if result.returncode != 0:
+            raise Exception(f"Failed to unmount {target_path}: {result.stderr.decode(errors='replace')}")
 
     logger.info(f"Path {target_path} unmounted successfully")
     return True
@@ -108,17 +314,34 @@ def bind_mount(source_path: str, target_path: str, readonly: bool = False) -> bo
     else:
         os.makedirs(target_path, exist_ok=True)
 
+    if _libc is not None:
+        try:
+            _sys_mount(source_path, target_path, None, MS_BIND)
+            if readonly:
+                # MS_RDONLY is ignored on the initial bind, it needs a remount
+                try:
+                    _sys_mount('none', target_path, None, MS_BIND | MS_REMOUNT | MS_RDONLY)
+                except OSError:
+                    _sys_umount(target_path)
+                    raise
+        except OSError as e:
+            raise Exception(f"Failed to bind mount: {e}")
+
+        logger.info(f"Bind mount created successfully")
+        return True
+
     options = ['bind']
     if readonly:
         options.append('ro')
 
     cmd = ['mount', '-o', ','.join(options), source_path, target_path]
 
-    logger.debug(f"Bind mount command: {' '.join(cmd)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Bind mount command: %s", ' '.join(cmd))
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
     if result.returncode != 0:
-        raise Exception(f"Failed to bind mount: {result.stderr}")
+        raise Exception(f"Failed to bind mount: {result.stderr.decode(errors='replace')}")
 
     logger.info(f"Bind mount created successfully")
     return True
@@ -135,11 +358,8 @@ def is_mounted(path: str) -> bool:
         True if mounted
     """
     try:
-        with open('/proc/mounts', 'r') as f:
-            for line in f:
-                if path in line:
-                    return True
-    except:
-        pass
+        return path in get_mounts()
+    except OSError as e:
+        logger.error(f"Error reading {PROC_MOUNTS_PATH}: {e}")
 
     return False
@@ -1,13 +1,24 @@
 """
 Filesystem resize operations
 """
+import os
 import subprocess
 import logging
+from typing import Dict, Tuple
 from ..constants import FS_TYPE_EXT4, FS_TYPE_XFS
 
 
 logger = logging.getLogger(__name__)
 
+# Filesystem types probed by blkid, {device_path: (inode, fstype)}
+_fs_types: Dict[str, Tuple[int, str]] = {}
+
+# Resize command builders per filesystem type: (device_path, mount_path) -> argv
+_RESIZE_CMDS = {
+    FS_TYPE_EXT4: lambda device_path, mount_path: ['resize2fs', device_path],
+    FS_TYPE_XFS: lambda device_path, mount_path: ['xfs_growfs', mount_path],
+}
+
 
 def resize_filesystem(device_path: str, mount_path: str, fstype: str) -> bool:
     """
@@ -26,14 +37,13 @@ def resize_filesystem(device_path: str, mount_path: str, fstype: str) -> bool:
     """
     logger.info(f"Resizing {fstype} filesystem on {device_path}")
 
-    if fstype == FS_TYPE_EXT4:
-        cmd = ['resize2fs', device_path]
-    elif fstype == FS_TYPE_XFS:
-        cmd = ['xfs_growfs', mount_path]
-    else:
+    build_cmd = _RESIZE_CMDS.get(fstype)
+    if build_cmd is None:
         raise ValueError(f"Unsupported filesystem type for resize: {fstype}")
+    cmd = build_cmd(device_path, mount_path)
 
-    logger.debug(f"Resize command: {' '.join(cmd)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Resize command: %s", ' '.join(cmd))
 
     result = subprocess.run(cmd, capture_output=True, text=True)
     if result.returncode != 0:
@@ -47,6 +57,9 @@ def get_filesystem_type(device_path: str) -> str:
     """
     Get filesystem type from device
 
+    Results are cached per device path and inode, so a new device node
+    appearing at the same path is probed again.
+
     Args:
         device_path: Device path
 
@@ -56,6 +69,18 @@ def get_filesystem_type(device_path: str) -> str:
     Raises:
         Exception: If filesystem type cannot be determined
     """
+    inode = os.stat(device_path).st_ino
+    cached = _fs_types.get(device_path)
+    if cached is not None and cached[0] == inode:
+        return cached[1]
+
+    fstype = _probe_filesystem_type(device_path)
+    _fs_types[device_path] = (inode, fstype)
+    return fstype
+
+
+def _probe_filesystem_type(device_path: str) -> str:
+    """Run blkid for filesystem type"""
     result = subprocess.run(
         ['blkid', '-o', 'value', '-s', 'TYPE', device_path],
         capture_output=True,
@@ -68,3 +93,8 @@ def get_filesystem_type(device_path: str) -> str:
             return fstype
 
     raise Exception(f"Cannot determine filesystem type for {device_path}")
+
+
+def forget_filesystem_type(device_path: str):
+    """Drop the cached filesystem type of a device (called when it is unstaged)"""
+    _fs_types.pop(device_path, None)
@@ -0,0 +1,36 @@
+"""
+Filesystem usage statistics
+"""
+import os
+from typing import Tuple
+
+
+def get_volume_stats(mount_path: str) -> Tuple[int, int, int, int, int, int]:
+    """
+    Get capacity and inode usage of a mounted filesystem
+
+    Uses statvfs(2) directly, no external tools.
+
+    Args:
+        mount_path: Mount path
+
+    Returns:
+        Tuple of (total_bytes, used_bytes, available_bytes,
+                  total_inodes, used_inodes, available_inodes)
+
+    Raises:
+        OSError: If path cannot be stat'ed
+    """
+    st = os.statvfs(mount_path)
+
+    frsize = st.f_frsize
+    total_bytes = st.f_blocks * frsize
+    # Reserved blocks count as neither used nor available, as in df(1)
+    used_bytes = (st.f_blocks - st.f_bfree) * frsize
+    available_bytes = st.f_bavail * frsize
+
+    total_inodes = st.f_files
+    used_inodes = st.f_files - st.f_ffree
+    available_inodes = st.f_favail
+
+    return total_bytes, used_bytes, available_bytes, total_inodes, used_inodes, available_inodes
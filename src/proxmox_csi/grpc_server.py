@@ -2,11 +2,11 @@
 gRPC server setup for CSI driver
 """
 import os
+import asyncio
 import logging
 import signal
-import time
 from concurrent import futures
-from typing import Optional
+from typing import Callable
 import grpc
 
 from .csi_pb2_grpc import (
@@ -18,10 +18,13 @@ from .services.identity import IdentityService
 from .services.controller import ControllerService
 from .services.node import NodeService
 from .config import CSIConfig
+from .constants import CONTROLLER_GRPC_WORKERS, NODE_GRPC_WORKERS
 
 
 logger = logging.getLogger(__name__)
 
+_ENDPOINT_PROTOCOLS = frozenset({'unix', 'tcp'})
+
 
 def parse_endpoint(endpoint: str) -> tuple[str, str]:
     """
@@ -36,12 +39,11 @@ def parse_endpoint(endpoint: str) -> tuple[str, str]:
     Raises:
         ValueError: If endpoint format is invalid
     """
-    if '://' not in endpoint:
+    protocol, sep, address = endpoint.partition('://')
+    if not sep:
         raise ValueError(f"Invalid endpoint format: {endpoint}")
 
-    protocol, address = endpoint.split('://', 1)
-
-    if protocol not in ['unix', 'tcp']:
+    if protocol not in _ENDPOINT_PROTOCOLS:
         raise ValueError(f"Unsupported protocol: {protocol}")
 
     return protocol, address
@@ -54,26 +56,31 @@ def cleanup_socket(address: str):
         os.unlink(address)
 
 
-def setup_signal_handlers(server: grpc.Server):
+def setup_signal_handlers(server: grpc.aio.Server):
     """Setup graceful shutdown on SIGTERM/SIGINT"""
-    def shutdown_handler(signum, frame):
+    loop = asyncio.get_running_loop()
+    stop_tasks = set()
+
+    def shutdown_handler(signum):
         logger.info(f"Received signal {signum}, shutting down...")
-        server.stop(grace=10)
+        task = loop.create_task(server.stop(grace=10))
+        stop_tasks.add(task)
+        task.add_done_callback(stop_tasks.discard)
 
-    signal.signal(signal.SIGTERM, shutdown_handler)
-    signal.signal(signal.SIGINT, shutdown_handler)
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(signum, shutdown_handler, signum)
 
 
-def serve_controller(endpoint: str, config: CSIConfig):
+def _make_server(endpoint: str) -> tuple[grpc.aio.Server, str, str]:
     """
-    Start CSI Controller gRPC server
+    Create gRPC server bound to endpoint
 
     Args:
         endpoint: gRPC endpoint (e.g., unix:///csi/csi.sock)
-        config: CSI configuration
-    """
-    logger.info(f"Starting CSI Controller server on {endpoint}")
 
+    Returns:
+        Tuple of (server, protocol, address)
+    """
     protocol, address = parse_endpoint(endpoint)
 
     # Cleanup unix socket if exists
@@ -84,21 +91,24 @@ def serve_controller(endpoint: str, config: CSIConfig):
             os.makedirs(socket_dir, exist_ok=True)
         cleanup_socket(address)
 
-    # Create gRPC server
-    server = grpc.server(
-        futures.ThreadPoolExecutor(max_workers=10),
-        options=[
-            ('grpc.max_send_message_length', 16 * 1024 * 1024),  # 16MB
-            ('grpc.max_receive_message_length', 16 * 1024 * 1024),  # 16MB
-        ]
-    )
-
-    # Add services
-    identity_service = IdentityService()
-    controller_service = ControllerService(config)
-
-    add_IdentityServicer_to_server(identity_service, server)
-    add_ControllerServicer_to_server(controller_service, server)
+    options = [
+        ('grpc.max_send_message_length', 16 * 1024 * 1024),  # 16MB
+        ('grpc.max_receive_message_length', 16 * 1024 * 1024),  # 16MB
+        # Sidecars hold one long-lived channel and multiplex every RPC on it
+        ('grpc.max_concurrent_streams', 1000),
+        # Probe idle channels so dead peers are noticed, and tolerate the
+        # sidecars' own keepalive pings instead of answering with GOAWAY
+        ('grpc.keepalive_time_ms', 30000),
+        ('grpc.keepalive_timeout_ms', 10000),
+        ('grpc.http2.max_pings_without_data', 0),
+        ('grpc.http2.min_time_between_pings_ms', 10000),
+        ('grpc.http2.min_ping_interval_without_data_ms', 10000),
+    ]
+    if protocol == 'tcp':
+        # Allow several processes to share the port
+        options.append(('grpc.so_reuseport', 1))
+
+    server = grpc.aio.server(options=options)
 
     # Bind to endpoint
     if protocol == 'unix':
@@ -106,81 +116,74 @@ def serve_controller(endpoint: str, config: CSIConfig):
     else:
         server.add_insecure_port(address)
 
+    return server, protocol, address
+
+
+async def _serve(endpoint: str, workers: int, name: str, registrar: Callable[[grpc.aio.Server], None]):
+    """
+    Run CSI gRPC server until terminated
+
+    RPCs are served on the asyncio event loop; blocking handler code is
+    offloaded to a thread pool of the given size.
+
+    Args:
+        endpoint: gRPC endpoint (e.g., unix:///csi/csi.sock)
+        workers: Number of worker threads for blocking handler code
+        name: Service name for logging (Controller or Node)
+        registrar: Adds role-specific servicers to the server
+    """
+    asyncio.get_running_loop().set_default_executor(
+        futures.ThreadPoolExecutor(max_workers=workers)
+    )
+
+    server, protocol, address = _make_server(endpoint)
+
+    # Add services
+    add_IdentityServicer_to_server(IdentityService(), server)
+    registrar(server)
+
     # Start server
-    server.start()
-    logger.info("CSI Controller server started successfully")
+    await server.start()
+    logger.info(f"CSI {name} server started successfully")
 
     # Setup signal handlers
     setup_signal_handlers(server)
 
     # Wait for termination
     try:
-        server.wait_for_termination()
-    except KeyboardInterrupt:
-        logger.info("Keyboard interrupt received")
+        await server.wait_for_termination()
     finally:
-        server.stop(grace=10)
+        await server.stop(grace=10)
         if protocol == 'unix':
             cleanup_socket(address)
-        logger.info("CSI Controller server stopped")
+        logger.info(f"CSI {name} server stopped")
 
 
-def serve_node(endpoint: str, node_name: str):
+async def serve_controller(endpoint: str, config: CSIConfig, workers: int = CONTROLLER_GRPC_WORKERS):
     """
-    Start CSI Node gRPC server
+    Start CSI Controller gRPC server
 
     Args:
         endpoint: gRPC endpoint (e.g., unix:///csi/csi.sock)
-        node_name: Kubernetes node name
+        config: CSI configuration
+        workers: Number of worker threads
     """
-    logger.info(f"Starting CSI Node server on {endpoint} for node {node_name}")
-
-    protocol, address = parse_endpoint(endpoint)
+    logger.info(f"Starting CSI Controller server on {endpoint} with {workers} workers")
 
-    # Cleanup unix socket if exists
-    if protocol == 'unix':
-        # Create directory if needed
-        socket_dir = os.path.dirname(address)
-        if socket_dir:
-            os.makedirs(socket_dir, exist_ok=True)
-        cleanup_socket(address)
-
-    # Create gRPC server
-    server = grpc.server(
-        futures.ThreadPoolExecutor(max_workers=10),
-        options=[
-            ('grpc.max_send_message_length', 16 * 1024 * 1024),  # 16MB
-            ('grpc.max_receive_message_length', 16 * 1024 * 1024),  # 16MB
-        ]
-    )
-
-    # Add services
-    identity_service = IdentityService()
-    node_service = NodeService(node_name)
+    await _serve(endpoint, workers, "Controller",
+                 lambda server: add_ControllerServicer_to_server(ControllerService(config), server))
 
-    add_IdentityServicer_to_server(identity_service, server)
-    add_NodeServicer_to_server(node_service, server)
 
-    # Bind to endpoint
-    if protocol == 'unix':
-        server.add_insecure_port(f'unix:{address}')
-    else:
-        server.add_insecure_port(address)
-
-    # Start server
-    server.start()
-    logger.info("CSI Node server started successfully")
+async def serve_node(endpoint: str, node_name: str, workers: int = NODE_GRPC_WORKERS):
+    """
+    Start CSI Node gRPC server
 
-    # Setup signal handlers
-    setup_signal_handlers(server)
+    Args:
+        endpoint: gRPC endpoint (e.g., unix:///csi/csi.sock)
+        node_name: Kubernetes node name
+        workers: Number of worker threads
+    """
+    logger.info(f"Starting CSI Node server on {endpoint} for node {node_name} with {workers} workers")
 
-    # Wait for termination
-    try:
-        server.wait_for_termination()
-    except KeyboardInterrupt:
-        logger.info("Keyboard interrupt received")
-    finally:
-        server.stop(grace=10)
-        if protocol == 'unix':
-            cleanup_socket(address)
-        logger.info("CSI Node server stopped")
+    await _serve(endpoint, workers, "Node",
+                 lambda server: add_NodeServicer_to_server(NodeService(node_name), server))
@@ -2,11 +2,13 @@
 CSI Controller entrypoint
 """
 import os
+import asyncio
 import sys
 import logging
 
 from .config import load_config
 from .grpc_server import serve_controller
+from .constants import CONTROLLER_GRPC_WORKERS
 
 
 def setup_logging():
@@ -29,6 +31,7 @@ def main():
 
     # Get configuration from environment
     endpoint = os.getenv('CSI_ENDPOINT', 'unix:///csi/csi.sock')
+    workers = int(os.getenv('CSI_GRPC_WORKERS', CONTROLLER_GRPC_WORKERS))
     config_path = os.getenv('CLOUD_CONFIG', '/etc/proxmox/config.yaml')
 
     if not os.path.exists(config_path):
@@ -41,7 +44,7 @@ def main():
         logger.info(f"Loaded configuration with {len(config.clusters)} clusters")
 
         # Start gRPC server
-        serve_controller(endpoint, config)
+        asyncio.run(serve_controller(endpoint, config, workers))
 
     except Exception as e:
         logger.error(f"Failed to start controller: {e}", exc_info=True)
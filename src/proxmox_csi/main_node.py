@@ -2,10 +2,12 @@
 CSI Node entrypoint
 """
 import os
+import asyncio
 import sys
 import logging
 
 from .grpc_server import serve_node
+from .constants import NODE_GRPC_WORKERS
 
 
 def setup_logging():
@@ -28,6 +30,7 @@ def main():
 
     # Get configuration from environment
     endpoint = os.getenv('CSI_ENDPOINT', 'unix:///csi/csi.sock')
+    workers = int(os.getenv('CSI_GRPC_WORKERS', NODE_GRPC_WORKERS))
     node_name = os.getenv('NODE_NAME')
 
     if not node_name:
@@ -36,7 +39,7 @@ def main():
 
     try:
         # Start gRPC server
-        serve_node(endpoint, node_name)
+        asyncio.run(serve_node(endpoint, node_name, workers))
 
     except Exception as e:
         logger.error(f"Failed to start node server: {e}", exc_info=True)
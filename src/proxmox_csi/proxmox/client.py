@@ -3,22 +3,128 @@ Proxmox REST API Client
 
 Implements direct REST API calls to Proxmox VE using token authentication.
 """
+import json
 import requests
 import logging
-from typing import Dict, Any, Optional, List
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import wraps
+from typing import Dict, Any, Optional, List, Callable, Iterable, Tuple
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from urllib3 import disable_warnings
 from urllib3.exceptions import InsecureRequestWarning
+from .cluster import ClusterState
+from .wwn import SCSI_DEVICE_RE
+from ..constants import STORAGE_VMID
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 logger = logging.getLogger(__name__)
 
+# Concurrent API requests per client (cluster-wide scans)
+MAX_PARALLEL_REQUESTS = 16
+
+# urllib3 connection pool sizing: pools per host and connections per pool
+POOL_CONNECTIONS = 32
+POOL_MAXSIZE = 64
+
+# (connect, read) timeout in seconds for a single API request
+REQUEST_TIMEOUT = (5, 60)
+
+# Seconds to reuse cluster topology (VM lists and configs) between API calls
+DEFAULT_CACHE_TTL = 10.0
+
+# Seconds to reuse the cluster node list, which changes far less often
+DEFAULT_NODES_CACHE_TTL = 60.0
+
+
+def _dumps(data: Any) -> bytes:
+    """Encode a request body as JSON, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def _loads(content: bytes) -> Any:
+    """Decode a JSON response body, with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(content)
+    return json.loads(content)
+
+
+def _ttl_cache(ttl_attr: str = 'cache_ttl') -> Callable:
+    """
+    Memoize a client method per arguments for a TTL read from the client
+
+    Entries are stored on the instance as {(name, *args): (expiry, result)}
+    and can be dropped with ProxmoxClient.invalidate_cache(). Concurrent
+    callers missing the same entry share a single call instead of each
+    hitting the API.
+
+    Args:
+        ttl_attr: Client attribute holding the TTL in seconds (0 disables)
+    """
+    def decorator(method: Callable) -> Callable:
+        @wraps(method)
+        def wrapper(self, *args):
+            ttl = getattr(self, ttl_attr)
+            if ttl <= 0:
+                return method(self, *args)
+
+            key = (method.__name__,) + args
+            now = time.monotonic()
+            with self._cache_lock:
+                entry = self._cache.get(key)
+                if entry is not None and entry[0] > now:
+                    return entry[1]
+                inflight = self._inflight.get(key)
+                if inflight is None:
+                    inflight = self._inflight[key] = Future()
+                    owner = True
+                else:
+                    owner = False
+
+            if not owner:
+                return inflight.result()
+
+            try:
+                result = method(self, *args)
+            except BaseException as e:
+                with self._cache_lock:
+                    if self._inflight.get(key) is inflight:
+                        del self._inflight[key]
+                inflight.set_exception(e)
+                raise
+
+            with self._cache_lock:
+                # Only cache if not invalidated while the call was running
+                if self._inflight.get(key) is inflight:
+                    del self._inflight[key]
+                    self._cache[key] = (now + ttl, result)
+            inflight.set_result(result)
+            return result
+
+        return wrapper
+
+    return decorator
+
 
 class ProxmoxClient:
     """Proxmox VE REST API Client"""
 
-    def __init__(self, url: str, token_id: str, token_secret: str, insecure: bool = False):
+    def __init__(self, url: str, token_id: str, token_secret: str, insecure: bool = False,
+                 max_workers: int = MAX_PARALLEL_REQUESTS,
+                 cache_ttl: float = DEFAULT_CACHE_TTL,
+                 nodes_cache_ttl: float = DEFAULT_NODES_CACHE_TTL,
+                 timeout: Tuple[float, float] = REQUEST_TIMEOUT,
+                 pool_connections: int = POOL_CONNECTIONS,
+                 pool_maxsize: int = POOL_MAXSIZE):
         """
         Initialize Proxmox API client
 
@@ -27,25 +133,37 @@ class ProxmoxClient:
             token_id: API token ID (e.g., csi@pve!csi-token)
             token_secret: API token secret
             insecure: Skip TLS certificate verification
+            max_workers: Maximum concurrent API requests for cluster-wide scans
+            cache_ttl: Seconds to cache VM lists and configs (0 disables caching)
+            nodes_cache_ttl: Seconds to cache the node list (0 disables caching)
+            timeout: (connect, read) timeout in seconds per request
+            pool_connections: Number of per-host connection pools to keep
+            pool_maxsize: Maximum kept-alive connections per pool
         """
-        self.base_url = url.rstrip('/api2/json').rstrip('/')
+        # Accept the URL with or without the /api2/json suffix
+        self.base_url = url.rstrip('/').removesuffix('/api2/json').rstrip('/')
         self.api_url = f"{self.base_url}/api2/json"
         self.token_id = token_id
         self.token_secret = token_secret
         self.verify = not insecure
+        self.timeout = timeout
 
         if insecure:
             disable_warnings(InsecureRequestWarning)
 
-        # Setup session with retry strategy
+        # Setup session with retry strategy. Proxmox reports API errors
+        # (bad parameters, missing VM config) as 500, so those are returned
+        # to the caller; only gateway/availability errors are retried
         self.session = requests.Session()
         retry_strategy = Retry(
             total=3,
             backoff_factor=0.3,
-            status_forcelist=[500, 502, 503, 504],
+            status_forcelist=[502, 503, 504],
             allowed_methods=["HEAD", "GET", "POST", "PUT", "DELETE"]
         )
-        adapter = HTTPAdapter(max_retries=retry_strategy)
+        # Pool sized for parallel scans so connections are reused, not discarded
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                              max_retries=retry_strategy)
         self.session.mount('https://', adapter)
         self.session.mount('http://', adapter)
 
@@ -55,6 +173,169 @@ class ProxmoxClient:
             'Content-Type': 'application/json'
         })
 
+        # Shared worker pool for fanning out API requests
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='proxmox-api')
+
+        # Short-lived cache of cluster topology, see _ttl_cache
+        self.cache_ttl = cache_ttl
+        self.nodes_cache_ttl = nodes_cache_ttl
+        self._cache: Dict[Tuple, Tuple[float, Any]] = {}
+        self._inflight: Dict[Tuple, Future] = {}
+        self._cache_lock = threading.Lock()
+
+        # Per-VM locks and last change times, see vm_lock and mark_vm_changed
+        self._vm_locks: Dict[int, threading.Lock] = {}
+        self._vm_changed: Dict[int, float] = {}
+
+    def invalidate_cache(self, *key) -> None:
+        """
+        Drop cached API results
+
+        Args:
+            key: Method name and arguments of the entry to drop,
+                e.g. ('get_vms', 'pve-1'); drops everything if omitted
+        """
+        with self._cache_lock:
+            # Calls already running may have read stale state; later
+            # callers must not join them
+            if key:
+                self._cache.pop(key, None)
+                self._inflight.pop(key, None)
+            else:
+                self._cache.clear()
+                self._inflight.clear()
+
+    def vm_lock(self, vmid: int) -> threading.Lock:
+        """
+        Get the lock serializing disk changes on a VM
+
+        Args:
+            vmid: VM ID
+
+        Returns:
+            Lock shared by all callers for this VM
+        """
+        with self._cache_lock:
+            return self._vm_locks.setdefault(vmid, threading.Lock())
+
+    def mark_vm_changed(self, vmid: int) -> None:
+        """
+        Record that we just changed a VM's config
+
+        Args:
+            vmid: VM ID
+        """
+        with self._cache_lock:
+            self._vm_changed[vmid] = time.monotonic()
+
+    def vm_changed_since(self, vmid: int, since: float) -> bool:
+        """
+        Check whether we changed a VM's config after a point in time
+
+        Args:
+            vmid: VM ID
+            since: Monotonic timestamp, e.g. ClusterState.taken_at
+
+        Returns:
+            True if mark_vm_changed was called for the VM at or after since
+        """
+        with self._cache_lock:
+            return self._vm_changed.get(vmid, float('-inf')) >= since
+
+    def parallel_map(self, fn: Callable, items: Iterable) -> List[Tuple[Any, Any, Optional[Exception]]]:
+        """
+        Call fn for each item concurrently
+
+        Args:
+            fn: Function taking a single item
+            items: Items to process
+
+        Returns:
+            List of (item, result, error) tuples in input order; error is
+            the raised exception (and result None) if the call failed
+        """
+        items = list(items)
+        futures = [self.executor.submit(fn, item) for item in items]
+
+        results = []
+        for item, future in zip(items, futures):
+            try:
+                results.append((item, future.result(), None))
+            except Exception as e:
+                results.append((item, None, e))
+        return results
+
+    def get_all_vms(self) -> Dict[str, List[Dict]]:
+        """
+        Get VMs on all cluster nodes, querying nodes concurrently
+
+        Nodes that fail to respond are logged and skipped.
+
+        Returns:
+            Dictionary mapping node names to VM lists
+        """
+        all_vms = {}
+        for node, vms, error in self.parallel_map(self.get_vms, self.get_nodes()):
+            if error is not None:
+                logger.error(f"Failed to query VMs on node {node}: {error}")
+                continue
+            all_vms[node] = vms
+        return all_vms
+
+    @_ttl_cache()
+    def get_cluster_vms(self) -> Dict[str, List[Dict]]:
+        """
+        Get VMs on all cluster nodes with a single /cluster/resources call
+
+        Falls back to querying nodes one by one if the token may not read
+        cluster resources (HTTP 403, e.g. no Sys.Audit).
+
+        Returns:
+            Dictionary mapping node names to VM lists
+        """
+        try:
+            resources = self._request('GET', '/cluster/resources', params={'type': 'vm'})
+        except requests.exceptions.HTTPError as e:
+            if e.response is None or e.response.status_code != 403:
+                raise
+            logger.warning("Cannot list cluster resources, querying nodes individually")
+            return self.get_all_vms()
+
+        all_vms = {}
+        for resource in resources:
+            # type=vm also lists LXC containers
+            if resource.get('type') != 'qemu':
+                continue
+            all_vms.setdefault(resource['node'], []).append(resource)
+        return all_vms
+
+    @_ttl_cache()
+    def snapshot_cluster(self) -> ClusterState:
+        """
+        Read every VM config in the cluster in one parallel sweep
+
+        STORAGE_VMID holds volumes at rest and is not scanned. VMs whose
+        config cannot be read are logged and recorded without disks.
+
+        Returns:
+            ClusterState indexed by VM and by attached disk
+        """
+        taken_at = time.monotonic()
+        all_vms = self.get_cluster_vms()
+        targets = [(vm['vmid'], node) for node, vms in all_vms.items()
+                   for vm in vms if vm['vmid'] != STORAGE_VMID]
+
+        configs = {}
+        for (vmid, node), vm_config, error in self.parallel_map(
+                lambda target: self.get_vm_config(*target), targets):
+            if error is not None:
+                logger.error(f"Failed to check VM {vmid} on {node}: {error}")
+                continue
+            configs[vmid] = self.extract_scsi_disks(vm_config)
+
+        return ClusterState.build(all_vms, configs, taken_at)
+
     def _request(self, method: str, path: str, data: Optional[Dict] = None,
                  params: Optional[Dict] = None) -> Any:
         """
@@ -74,28 +355,34 @@ class ProxmoxClient:
         """
         url = f"{self.api_url}{path}"
 
-        logger.debug(f"Proxmox API Request: {method} {path}")
-        if data:
-            logger.debug(f"Proxmox API Request body: {data}")
-        if params:
-            logger.debug(f"Proxmox API Request params: {params}")
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Proxmox API Request: %s %s", method, path)
+            if data:
+                logger.debug("Proxmox API Request body: %s", data)
+            if params:
+                logger.debug("Proxmox API Request params: %s", params)
 
         response = self.session.request(
             method,
             url,
-            json=data,
+            data=_dumps(data) if data is not None else None,
             params=params,
-            verify=self.verify
+            verify=self.verify,
+            timeout=self.timeout
         )
 
-        logger.debug(f"Proxmox API Response: status={response.status_code}")
+        if debug:
+            logger.debug("Proxmox API Response: status=%s", response.status_code)
 
         response.raise_for_status()
 
-        result = response.json()
-        logger.debug(f"Proxmox API Response data: {result}")
+        result = _loads(response.content)
+        if debug:
+            logger.debug("Proxmox API Response data: %s", result)
         return result.get('data', result)
 
+    @_ttl_cache('nodes_cache_ttl')
     def get_nodes(self) -> List[str]:
         """
         Get list of cluster nodes
@@ -106,6 +393,7 @@ class ProxmoxClient:
         nodes = self._request('GET', '/nodes')
         return [node['node'] for node in nodes]
 
+    @_ttl_cache()
     def get_vms(self, node: str) -> List[Dict]:
         """
         Get list of VMs on a node
@@ -170,7 +458,7 @@ class ProxmoxClient:
 
         logger.info(f"create_vm_disk: vmid={vmid}, node={node}, storage={storage}, "
                    f"filename={filename}, size_bytes={size_bytes}, size_gb={size_gb:.2f}")
-        logger.debug(f"create_vm_disk: POST /nodes/{node}/storage/{storage}/content with data={data}")
+        logger.debug("create_vm_disk: POST /nodes/%s/storage/%s/content with data=%s", node, storage, data)
 
         return self._request('POST', f'/nodes/{node}/storage/{storage}/content',
                            data=data)
@@ -239,7 +527,7 @@ class ProxmoxClient:
         """
         scsi_disks = {}
         for key, value in vm_config.items():
-            if key.startswith('scsi') and isinstance(value, str):
+            if isinstance(value, str) and SCSI_DEVICE_RE.match(key):
                 scsi_disks[key] = value
         return scsi_disks
 
@@ -257,22 +545,15 @@ class ProxmoxClient:
         """
         logger.info(f"Searching for VM with name: {vm_name}")
 
-        nodes = self.get_nodes()
-        for node in nodes:
-            try:
-                vms = self.get_vms(node)
-                for vm in vms:
-                    vmid = vm.get('vmid')
-                    name = vm.get('name', '')
-
-                    # Check if name matches (case-insensitive)
-                    if name.lower() == vm_name.lower():
-                        logger.info(f"Found VM {vmid} on node {node} with name {name}")
-                        return (vmid, node)
+        # Names match case-insensitively (casefold handles non-ASCII names)
+        target = vm_name.casefold()
 
-            except Exception as e:
-                logger.error(f"Failed to query VMs on node {node}: {e}")
-                continue
+        for node, vms in self.get_cluster_vms().items():
+            for vm in vms:
+                if vm.get('name', '').casefold() == target:
+                    vmid = vm.get('vmid')
+                    logger.info(f"Found VM {vmid} on node {node} with name {vm_name}")
+                    return (vmid, node)
 
         logger.warning(f"No VM found with name: {vm_name}")
         return None
@@ -287,20 +568,13 @@ class ProxmoxClient:
         Returns:
             Node name if found, None otherwise
         """
-        logger.debug(f"Searching for node hosting VM {vmid}")
-
-        nodes = self.get_nodes()
-        for node in nodes:
-            try:
-                vms = self.get_vms(node)
-                for vm in vms:
-                    if vm.get('vmid') == vmid:
-                        logger.debug(f"Found VM {vmid} on node {node}")
-                        return node
+        logger.debug("Searching for node hosting VM %s", vmid)
 
-            except Exception as e:
-                logger.error(f"Failed to query VMs on node {node}: {e}")
-                continue
+        for node, vms in self.get_cluster_vms().items():
+            for vm in vms:
+                if vm.get('vmid') == vmid:
+                    logger.debug("Found VM %s on node %s", vmid, node)
+                    return node
 
         logger.warning(f"VM {vmid} not found on any node")
         return None
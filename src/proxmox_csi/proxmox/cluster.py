@@ -0,0 +1,135 @@
+"""
+Point-in-time view of VM disk attachments across the cluster
+"""
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+from .wwn import SCSI_DEVICE_RE
+
+
+logger = logging.getLogger(__name__)
+
+
+class ClusterState:
+    """Cluster snapshot indexed by VM and by attached disk"""
+
+    def __init__(self):
+        # Monotonic time the snapshot was started
+        self.taken_at = time.monotonic()
+        # vmid -> node
+        self.nodes: Dict[int, str] = {}
+        # vmid -> {device: disk_string}, only for VMs whose config was read
+        self.vms: Dict[int, Dict[str, str]] = {}
+        # vmid -> bitmask of used LUNs, only for VMs whose config was read
+        self.used_luns: Dict[int, int] = {}
+        # disk name -> (vmid, node, lun)
+        self.disks: Dict[str, Tuple[int, str, int]] = {}
+        # casefolded VM name -> (vmid, node)
+        self.names: Dict[str, Tuple[int, str]] = {}
+
+    def add_vm(self, vmid: int, node: str, name: str,
+               scsi_disks: Optional[Dict[str, str]]) -> None:
+        """
+        Record a VM and index its SCSI disks
+
+        Args:
+            vmid: VM ID
+            node: Node the VM is on
+            name: VM name
+            scsi_disks: Dictionary mapping device names to disk strings,
+                or None if the VM config could not be read
+        """
+        self.nodes[vmid] = node
+        self.names.setdefault(name.casefold(), (vmid, node))
+        if scsi_disks is None:
+            return
+
+        self.vms[vmid] = scsi_disks
+
+        used = 0
+        for device, disk_string in scsi_disks.items():
+            match = SCSI_DEVICE_RE.match(device)
+            if not match:
+                continue
+            lun = int(match.group(1))
+            used |= 1 << lun
+            # "storage:vm-9999-pvc-abc,wwn=0x...,backup=0" -> "vm-9999-pvc-abc"
+            volume = disk_string.split(',', 1)[0].partition(':')[2]
+            if volume:
+                self.disks[volume] = (vmid, node, lun)
+        self.used_luns[vmid] = used
+
+    def find_vm_by_name(self, vm_name: str) -> Optional[Tuple[int, str]]:
+        """
+        Find VM by hostname/name (case-insensitive)
+
+        Args:
+            vm_name: VM hostname/name to search for
+
+        Returns:
+            Tuple of (vmid, node) if found, None otherwise
+        """
+        return self.names.get(vm_name.casefold())
+
+    def find_vm_node(self, vmid: int) -> Optional[str]:
+        """
+        Find which node a VM is on
+
+        Args:
+            vmid: VM ID
+
+        Returns:
+            Node name if found, None otherwise
+        """
+        return self.nodes.get(vmid)
+
+    def find_disk(self, disk_name: str) -> Optional[Tuple[int, str, int]]:
+        """
+        Find where a disk is attached
+
+        Args:
+            disk_name: Disk name (e.g., vm-9999-pvc-abc)
+
+        Returns:
+            Tuple of (vmid, node, lun) if attached, None otherwise
+        """
+        return self.disks.get(disk_name)
+
+    def scsi_disks(self, vmid: int) -> Optional[Dict[str, str]]:
+        """
+        Get SCSI disks of a VM
+
+        Args:
+            vmid: VM ID
+
+        Returns:
+            Dictionary mapping device names to disk strings, or None if
+            the VM config is not part of the snapshot
+        """
+        return self.vms.get(vmid)
+
+    @classmethod
+    def build(cls, all_vms: Dict[str, List[Dict]],
+              configs: Dict[int, Dict[str, str]],
+              taken_at: Optional[float] = None) -> 'ClusterState':
+        """
+        Build a snapshot from node VM lists and their SCSI disks
+
+        Args:
+            all_vms: Dictionary mapping node names to VM lists
+            configs: Dictionary mapping VM IDs to their SCSI disks; VMs
+                missing here are recorded without disks
+            taken_at: Monotonic time the data was read from (defaults to now)
+
+        Returns:
+            ClusterState object
+        """
+        state = cls()
+        if taken_at is not None:
+            state.taken_at = taken_at
+        for node, vms in all_vms.items():
+            for vm in vms:
+                vmid = vm.get('vmid')
+                state.add_vm(vmid, node, vm.get('name', ''), configs.get(vmid))
+        logger.debug("Cluster snapshot: %d VMs, %d attached disks", len(state.vms), len(state.disks))
+        return state
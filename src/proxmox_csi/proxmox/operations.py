@@ -2,9 +2,12 @@
 Proxmox volume operations with split-brain protection
 """
 import logging
-from typing import Dict, Optional, Tuple
+import requests
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
 from .client import ProxmoxClient
-from .wwn import calculate_wwn, find_free_lun, is_disk_attached
+from .cluster import ClusterState
+from .wwn import calculate_wwn, find_disk_lun, find_free_lun_from_used, used_lun_mask
 from ..constants import STORAGE_VMID, DEVICE_PREFIX
 from ..volume.volume_id import parse_volume_id, create_volume_id
 
@@ -12,6 +15,101 @@ from ..volume.volume_id import parse_volume_id, create_volume_id
 logger = logging.getLogger(__name__)
 
 
+def _locate_vm(client: ProxmoxClient, state: Optional[ClusterState],
+               vmid: int) -> Tuple[Optional[str], Dict, Optional[int]]:
+    """
+    Look up a VM's node and SCSI disks
+
+    Uses the cluster snapshot if one is given. The VM config is read
+    instead if there is no snapshot, the snapshot has no config for the
+    VM, or we changed the VM after the snapshot was taken. The full config
+    is returned as is, since find_disk_lun and used_lun_mask skip non-SCSI
+    keys themselves.
+
+    Returns:
+        Tuple of (node, scsi_disks, used LUN mask); node is None if the VM
+        does not exist, the mask is None unless taken from the snapshot
+    """
+    if state is None:
+        # Cluster VM listing plus one config, no sweep of every VM
+        vm_node = client.find_vm_node(vmid)
+        if vm_node is None:
+            return None, {}, None
+        return vm_node, client.get_vm_config(vmid, vm_node), None
+
+    vm_node = state.find_vm_node(vmid)
+    if vm_node is None:
+        return None, {}, None
+
+    scsi_disks = state.scsi_disks(vmid)
+    if scsi_disks is None or client.vm_changed_since(vmid, state.taken_at):
+        return vm_node, client.get_vm_config(vmid, vm_node), None
+    return vm_node, scsi_disks, state.used_luns.get(vmid)
+
+
+def _invalidate(client: ProxmoxClient, node: str, vmid: int) -> None:
+    """Drop cached cluster state after changing a VM on node"""
+    client.mark_vm_changed(vmid)
+    client.invalidate_cache('get_vms', node)
+    client.invalidate_cache('snapshot_cluster')
+
+
+def _serialized_per_vm(operation: Callable) -> Callable:
+    """
+    Run a VM operation under the client's lock for that VM
+
+    Concurrent RPCs may target the same VM; without the lock two attaches
+    could both pick the same free LUN.
+    """
+    @wraps(operation)
+    def wrapper(client: ProxmoxClient, vmid: int, *args, **kwargs):
+        with client.vm_lock(vmid):
+            return operation(client, vmid, *args, **kwargs)
+
+    return wrapper
+
+
+def _is_stale_location(error: requests.exceptions.RequestException) -> bool:
+    """
+    Tell whether a failed API call may succeed against fresh cluster state
+
+    True for connection errors and timeouts, and for the error Proxmox
+    returns when the VM config is not on the node we asked (the VM has
+    migrated); other HTTP errors are permanent.
+    """
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    response = getattr(error, 'response', None)
+    if response is None:
+        return False
+    # pveproxy reports "Configuration file '...' does not exist" as a 500
+    return response.status_code == 404 or 'does not exist' in (response.reason or '')
+
+
+def _retry_with_fresh_state(operation: Callable) -> Callable:
+    """
+    Retry a VM operation once against fresh cluster state
+
+    The snapshot passed in (or the client's cached VM listing) may predate
+    a VM migration, in which case API calls against the old node fail. The
+    retry locates the VM from a fresh listing rather than a full sweep.
+    Errors fresh state cannot fix are raised straight away.
+    """
+    @wraps(operation)
+    def wrapper(client: ProxmoxClient, *args, **kwargs):
+        try:
+            return operation(client, *args, **kwargs)
+        except requests.exceptions.RequestException as e:
+            if not _is_stale_location(e):
+                raise
+            logger.warning(f"{operation.__name__} failed ({e}), retrying with fresh cluster state")
+            client.invalidate_cache()
+            kwargs['state'] = None
+            return operation(client, *args, **kwargs)
+
+    return wrapper
+
+
 def create_volume(client: ProxmoxClient, region: str, zone: str,
                  storage: str, pvc_name: str, size_bytes: int) -> str:
     """
@@ -32,8 +130,9 @@ def create_volume(client: ProxmoxClient, region: str, zone: str,
     size_gib = size_bytes / (1024 ** 3)
 
     logger.info(f"Creating volume {disk_name} on {zone}/{storage}, size={size_bytes} bytes ({size_gib:.2f} GiB)")
-    logger.debug(f"create_volume params: region={region}, zone={zone}, storage={storage}, "
-                f"pvc_name={pvc_name}, STORAGE_VMID={STORAGE_VMID}, disk_name={disk_name}")
+    logger.debug("create_volume params: region=%s, zone=%s, storage=%s, "
+                 "pvc_name=%s, STORAGE_VMID=%s, disk_name=%s",
+                 region, zone, storage, pvc_name, STORAGE_VMID, disk_name)
 
     client.create_vm_disk(
         vmid=STORAGE_VMID,
@@ -42,6 +141,7 @@ def create_volume(client: ProxmoxClient, region: str, zone: str,
         filename=disk_name,
         size_bytes=size_bytes
     )
+    client.invalidate_cache('get_vms', zone)
 
     volume_id = create_volume_id(region, zone, storage, pvc_name, STORAGE_VMID)
 
@@ -76,7 +176,10 @@ def delete_volume(client: ProxmoxClient, volume_id: str, default_region: str = "
     return True
 
 
-def attach_volume(client: ProxmoxClient, vmid: int, volume_id: str, default_region: str = "") -> Dict[str, str]:
+@_retry_with_fresh_state
+@_serialized_per_vm
+def attach_volume(client: ProxmoxClient, vmid: int, volume_id: str, default_region: str = "",
+                  state: Optional[ClusterState] = None) -> Dict[str, str]:
     """
     Attach volume to VM with WWN identifier
 
@@ -85,6 +188,8 @@ def attach_volume(client: ProxmoxClient, vmid: int, volume_id: str, default_regi
         vmid: VM ID to attach to
         volume_id: Volume ID
         default_region: Default region for parsing volume_id
+        state: Cluster snapshot to reuse; without one the VM is found
+            from the cluster VM listing and only its own config is read
 
     Returns:
         Publish context with DevicePath and lun
@@ -97,18 +202,14 @@ def attach_volume(client: ProxmoxClient, vmid: int, volume_id: str, default_regi
     logger.info(f"Attaching volume {volume_id} to VM {vmid}")
 
     # Find which node the VM is currently on
-    vm_node = client.find_vm_node(vmid)
+    vm_node, scsi_disks, used = _locate_vm(client, state, vmid)
     if vm_node is None:
         raise Exception(f"VM {vmid} not found on any node")
 
-    logger.debug(f"VM {vmid} is on node {vm_node}")
-
-    # Get VM config
-    vm_config = client.get_vm_config(vmid, vm_node)
-    scsi_disks = client.extract_scsi_disks(vm_config)
+    logger.debug("VM %s is on node %s", vmid, vm_node)
 
     # Check if already attached
-    existing_lun = is_disk_attached(scsi_disks, disk)
+    existing_lun = find_disk_lun(scsi_disks, disk)
     if existing_lun is not None:
         logger.info(f"Volume {volume_id} already attached to VM {vmid} at LUN {existing_lun}")
         wwn = calculate_wwn(existing_lun)
@@ -117,8 +218,10 @@ def attach_volume(client: ProxmoxClient, vmid: int, volume_id: str, default_regi
             'lun': str(existing_lun)
         }
 
-    # Find free LUN
-    lun = find_free_lun(scsi_disks)
+    # Find free LUN, reusing the mask indexed with the snapshot
+    if used is None:
+        used = used_lun_mask(scsi_disks)
+    lun = find_free_lun_from_used(used)
     if lun is None:
         raise Exception(f"No free LUN available for VM {vmid}")
 
@@ -132,6 +235,7 @@ def attach_volume(client: ProxmoxClient, vmid: int, volume_id: str, default_regi
     logger.info(f"Attaching {disk} to VM {vmid} on node {vm_node} as {device} with WWN 0x{wwn}")
 
     client.update_vm_config(vmid, vm_node, {device: disk_string})
+    _invalidate(client, vm_node, vmid)
 
     return {
         'DevicePath': f'/dev/disk/by-id/wwn-0x{wwn}',
@@ -139,7 +243,10 @@ def attach_volume(client: ProxmoxClient, vmid: int, volume_id: str, default_regi
     }
 
 
-def detach_volume(client: ProxmoxClient, vmid: int, volume_id: str, default_region: str = "") -> bool:
+@_retry_with_fresh_state
+@_serialized_per_vm
+def detach_volume(client: ProxmoxClient, vmid: int, volume_id: str, default_region: str = "",
+                  state: Optional[ClusterState] = None) -> bool:
     """
     Detach volume from VM
 
@@ -148,6 +255,8 @@ def detach_volume(client: ProxmoxClient, vmid: int, volume_id: str, default_regi
         vmid: VM ID
         volume_id: Volume ID
         default_region: Default region for parsing volume_id
+        state: Cluster snapshot to reuse; without one the VM is found
+            from the cluster VM listing and only its own config is read
 
     Returns:
         True if successful
@@ -157,19 +266,15 @@ def detach_volume(client: ProxmoxClient, vmid: int, volume_id: str, default_regi
     logger.info(f"Detaching volume {volume_id} from VM {vmid}")
 
     # Find which node the VM is currently on (it might have migrated)
-    vm_node = client.find_vm_node(vmid)
+    vm_node, scsi_disks, _ = _locate_vm(client, state, vmid)
     if vm_node is None:
         logger.warning(f"VM {vmid} not found on any node, assuming already deleted")
         return True
 
-    logger.debug(f"VM {vmid} is on node {vm_node}")
-
-    # Get VM config
-    vm_config = client.get_vm_config(vmid, vm_node)
-    scsi_disks = client.extract_scsi_disks(vm_config)
+    logger.debug("VM %s is on node %s", vmid, vm_node)
 
     # Find disk
-    lun = is_disk_attached(scsi_disks, disk)
+    lun = find_disk_lun(scsi_disks, disk)
     if lun is None:
         logger.warning(f"Volume {volume_id} not attached to VM {vmid}, already detached")
         return True
@@ -183,13 +288,15 @@ def detach_volume(client: ProxmoxClient, vmid: int, volume_id: str, default_regi
     client.update_vm_config(vmid, vm_node, {
         'delete': device
     })
+    _invalidate(client, vm_node, vmid)
 
     logger.info(f"Volume {volume_id} detached from VM {vmid}")
     return True
 
 
 def check_existing_attachments(client: ProxmoxClient, region: str,
-                               storage: str, disk_name: str) -> Tuple[Optional[int], Optional[int]]:
+                               storage: str, disk_name: str,
+                               state: Optional[ClusterState] = None) -> Tuple[Optional[int], Optional[int]]:
     """
     CRITICAL: Split-brain protection
 
@@ -201,48 +308,31 @@ def check_existing_attachments(client: ProxmoxClient, region: str,
         region: Cluster region
         storage: Storage ID
         disk_name: Disk name to search for
+        state: Cluster snapshot to reuse (taken from client if omitted)
 
     Returns:
         Tuple of (vmid, lun) if found, (None, None) otherwise
     """
     logger.info(f"Checking for existing attachments of {disk_name}")
 
-    nodes = client.get_nodes()
-
-    for node in nodes:
-        try:
-            vms = client.get_vms(node)
-
-            for vm in vms:
-                vmid = vm['vmid']
-
-                # Skip STORAGE_VMID (volumes at rest, not attached to workers)
-                if vmid == STORAGE_VMID:
-                    continue
+    if state is None:
+        state = client.snapshot_cluster()
 
-                try:
-                    vm_config = client.get_vm_config(vmid, node)
-                    scsi_disks = client.extract_scsi_disks(vm_config)
-
-                    lun = is_disk_attached(scsi_disks, disk_name)
-                    if lun is not None:
-                        logger.warning(f"Volume {disk_name} is already attached to VM {vmid} (LUN {lun}) on node {node}")
-                        return vmid, lun
-
-                except Exception as e:
-                    logger.error(f"Failed to check VM {vmid} on {node}: {e}")
-                    continue
-
-        except Exception as e:
-            logger.error(f"Failed to get VMs from node {node}: {e}")
-            continue
+    attachment = state.find_disk(disk_name)
+    if attachment is not None:
+        vmid, node, lun = attachment
+        logger.warning(f"Volume {disk_name} is already attached to VM {vmid} (LUN {lun}) on node {node}")
+        return vmid, lun
 
     logger.info(f"No existing attachments found for {disk_name}")
     return None, None
 
 
+@_retry_with_fresh_state
+@_serialized_per_vm
 def expand_volume(client: ProxmoxClient, vmid: int, volume_id: str,
-                 new_size_bytes: int, default_region: str = "") -> bool:
+                 new_size_bytes: int, default_region: str = "",
+                 state: Optional[ClusterState] = None) -> bool:
     """
     Expand volume at storage level
 
@@ -252,6 +342,8 @@ def expand_volume(client: ProxmoxClient, vmid: int, volume_id: str,
         volume_id: Volume ID
         new_size_bytes: New size in bytes
         default_region: Default region for parsing volume_id
+        state: Cluster snapshot to reuse; without one the VM is found
+            from the cluster VM listing and only its own config is read
 
     Returns:
         True if successful
@@ -263,18 +355,14 @@ def expand_volume(client: ProxmoxClient, vmid: int, volume_id: str,
 
     logger.info(f"Expanding volume {volume_id} to {new_size_bytes} bytes")
 
-    # Find which node the VM is currently on
-    vm_node = client.find_vm_node(vmid)
+    # Find which node the VM is currently on and the disk's LUN
+    vm_node, scsi_disks, _ = _locate_vm(client, state, vmid)
     if vm_node is None:
         raise Exception(f"VM {vmid} not found on any node")
 
-    logger.debug(f"VM {vmid} is on node {vm_node}")
-
-    # Get VM config to find LUN
-    vm_config = client.get_vm_config(vmid, vm_node)
-    scsi_disks = client.extract_scsi_disks(vm_config)
+    logger.debug("VM %s is on node %s", vmid, vm_node)
 
-    lun = is_disk_attached(scsi_disks, disk)
+    lun = find_disk_lun(scsi_disks, disk)
     if lun is None:
         raise Exception(f"Volume {volume_id} not attached to VM {vmid}, cannot resize")
 
@@ -284,6 +372,7 @@ def expand_volume(client: ProxmoxClient, vmid: int, volume_id: str,
     logger.info(f"Resizing device {device} to {size_mb}M on node {vm_node}")
 
     client.resize_vm_disk(vmid, vm_node, device, f"{size_mb}M")
+    _invalidate(client, vm_node, vmid)
 
     logger.info(f"Volume {volume_id} expanded successfully")
     return True
@@ -1,8 +1,23 @@
 """
 WWN (World Wide Name) and LUN management for SCSI devices
 """
+import re
 from typing import Optional, Dict
-from ..constants import LUN_MIN, LUN_MAX
+from ..constants import LUN_MIN, LUN_MAX, DEVICE_PREFIX
+
+
+# SCSI disk keys in a VM config ("scsi5"), capturing the LUN; not "scsihw"
+SCSI_DEVICE_RE = re.compile(rf'^{DEVICE_PREFIX}(\d+)$')
+
+
+def _format_wwn(lun: int) -> str:
+    """Hex-encode the PVC-ID{LUN:02d} identifier"""
+    identifier = f"PVC-ID{lun:02d}"
+    return identifier.encode('utf-8').hex()
+
+
+# WWNs of all valid LUNs, indexed by LUN
+_WWN_BY_LUN = tuple(_format_wwn(lun) for lun in range(LUN_MAX + 1))
 
 
 def calculate_wwn(lun: int) -> str:
@@ -21,8 +36,48 @@ def calculate_wwn(lun: int) -> str:
         >>> calculate_wwn(5)
         '5043432d49443035'  # hex of "PVC-ID05"
     """
-    identifier = f"PVC-ID{lun:02d}"
-    return identifier.encode('utf-8').hex()
+    if 0 <= lun <= LUN_MAX:
+        return _WWN_BY_LUN[lun]
+    return _format_wwn(lun)
+
+
+def used_lun_mask(scsi_disks: Dict) -> int:
+    """
+    Collect the LUNs used by SCSI disks as a bitmask
+
+    Args:
+        scsi_disks: Dictionary of existing SCSI disks {device: disk_string}
+
+    Returns:
+        Integer with bit n set for each device scsiN
+    """
+    used = 0
+    for device in scsi_disks.keys():
+        match = SCSI_DEVICE_RE.match(device)
+        if match:
+            used |= 1 << int(match.group(1))
+    return used
+
+
+def find_free_lun_from_used(used: int, min_lun: int = LUN_MIN,
+                            max_lun: int = LUN_MAX) -> Optional[int]:
+    """
+    Find first available LUN given a bitmask of used LUNs
+
+    Args:
+        used: Bitmask of used LUNs (see used_lun_mask)
+        min_lun: Minimum LUN number (default: 1)
+        max_lun: Maximum LUN number (default: 29)
+
+    Returns:
+        First available LUN number, or None if all LUNs are used
+    """
+    free = ~used & ((1 << (max_lun + 1)) - 1) & ~((1 << min_lun) - 1)
+    if not free:
+        return None
+
+    # Lowest set bit is the first available LUN
+    return (free & -free).bit_length() - 1
 
 
 def find_free_lun(scsi_disks: Dict[str, str], min_lun: int = LUN_MIN,
@@ -38,19 +93,32 @@ def find_free_lun(scsi_disks: Dict[str, str], min_lun: int = LUN_MIN,
     Returns:
         First available LUN number, or None if all LUNs are used
     """
-    used_luns = set()
+    return find_free_lun_from_used(used_lun_mask(scsi_disks), min_lun, max_lun)
 
-    for device in scsi_disks.keys():
-        if device.startswith('scsi'):
-            try:
-                lun_num = int(device[4:])  # Extract number from "scsi5"
-                used_luns.add(lun_num)
-            except ValueError:
-                continue
 
-    for lun in range(min_lun, max_lun + 1):
-        if lun not in used_luns:
-            return lun
+def find_disk_lun(vm_config: Dict, disk_name: str) -> Optional[int]:
+    """
+    Find the LUN a disk is attached at in a single pass over a VM config
+
+    Accepts a full VM config as well as the result of extract_scsi_disks;
+    non-SCSI keys and non-string values are skipped.
+
+    Args:
+        vm_config: VM configuration dictionary
+        disk_name: Disk name to search for
+
+    Returns:
+        LUN number if attached, None otherwise
+    """
+    for device, value in vm_config.items():
+        if not isinstance(value, str):
+            continue
+        # "storage:vm-9999-pvc-abc,wwn=0x...,backup=0" -> "vm-9999-pvc-abc"
+        if value.split(',', 1)[0].partition(':')[2] != disk_name:
+            continue
+        match = SCSI_DEVICE_RE.match(device)
+        if match:
+            return int(match.group(1))
 
     return None
 
@@ -66,12 +134,4 @@ def is_disk_attached(scsi_disks: Dict[str, str], disk_name: str) -> Optional[int
     Returns:
         LUN number if attached, None otherwise
     """
-    for device, disk_string in scsi_disks.items():
-        if disk_name in disk_string and device.startswith('scsi'):
-            try:
-                lun = int(device[4:])
-                return lun
-            except ValueError:
-                continue
-
-    return None
+    return find_disk_lun(scsi_disks, disk_name)
@@ -0,0 +1,59 @@
+"""
+Helpers for running blocking servicer code under grpc.aio
+"""
+import asyncio
+from functools import wraps
+from typing import Callable
+import grpc
+
+
+class RPCAbort(Exception):
+    """Raised by BlockingContext.abort to unwind a blocking handler"""
+
+    def __init__(self, code: grpc.StatusCode, details: str):
+        super().__init__(details)
+        self.code = code
+        self.details = details
+
+
+class BlockingContext:
+    """
+    Servicer context for handlers running in a worker thread
+
+    grpc.aio's context.abort() is a coroutine and cannot be called from a
+    thread. This wrapper raises RPCAbort instead, which blocking_rpc turns
+    into a real abort on the event loop. The first abort wins, so a
+    handler's catch-all "except Exception: context.abort(INTERNAL, ...)"
+    does not overwrite a more specific status code.
+    """
+
+    def __init__(self, context: grpc.aio.ServicerContext):
+        self._context = context
+        self._abort = None
+
+    def abort(self, code: grpc.StatusCode, details: str = ''):
+        if self._abort is None:
+            self._abort = RPCAbort(code, details)
+        raise self._abort
+
+    def __getattr__(self, name):
+        return getattr(self._context, name)
+
+
+def blocking_rpc(method: Callable) -> Callable:
+    """
+    Turn a blocking servicer method into an async one
+
+    The wrapped method runs in the event loop's default executor, so
+    subprocess calls, sysfs scans and Proxmox API requests do not stall
+    other RPCs.
+    """
+    @wraps(method)
+    async def wrapper(self, request, context):
+        blocking_context = BlockingContext(context)
+        try:
+            return await asyncio.to_thread(method, self, request, blocking_context)
+        except RPCAbort as e:
+            await context.abort(e.code, e.details)
+
+    return wrapper
@@ -2,8 +2,10 @@
 CSI Controller Service Implementation
 """
 import logging
+import threading
 import grpc
-from typing import Dict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
 from ..csi_pb2 import (
     CreateVolumeResponse,
     DeleteVolumeResponse,
@@ -15,7 +17,10 @@ from ..csi_pb2 import (
     ControllerServiceCapability
 )
 from ..csi_pb2_grpc import ControllerServicer
+from .aio import blocking_rpc
 from ..proxmox.client import ProxmoxClient
+from ..proxmox.cluster import ClusterState
+from ..proxmox.wwn import calculate_wwn
 from ..proxmox.operations import (
     create_volume,
     delete_volume,
@@ -35,6 +40,13 @@ from ..constants import (
 
 logger = logging.getLogger(__name__)
 
+# RPCs advertised by GetCapabilities
+_CONTROLLER_RPC_TYPES = (
+    ControllerServiceCapability.RPC.CREATE_DELETE_VOLUME,
+    ControllerServiceCapability.RPC.PUBLISH_UNPUBLISH_VOLUME,
+    ControllerServiceCapability.RPC.EXPAND_VOLUME,
+)
+
 
 class ControllerService(ControllerServicer):
     """CSI Controller Server"""
@@ -45,21 +57,85 @@ class ControllerService(ControllerServicer):
 
         # Initialize Proxmox clients for each cluster
         for cluster in config.clusters:
-            self.clients[cluster.region] = ProxmoxClient(
+            client = ProxmoxClient(
                 url=cluster.url,
                 token_id=cluster.token_id,
                 token_secret=cluster.token_secret,
                 insecure=cluster.insecure
             )
+            self.clients[cluster.region] = client
+
+            # Open a pooled API connection and fill the node cache in the
+            # background, so the first RPC does not pay the TLS handshake
+            client.executor.submit(self._warm_up, cluster.region, client)
+
+        # volume_id -> [lock, holders], see _volume_lock
+        self._volume_locks: Dict[str, List] = {}
+        self._volume_locks_lock = threading.Lock()
+
+        # First configured cluster serves volumes without an explicit region
+        self._default_region = config.clusters[0].region if config.clusters else ""
+        self._default_client = self.clients.get(self._default_region)
+
+        # Response never changes, build it once and share it read-only
+        capabilities = [
+            ControllerServiceCapability(rpc=ControllerServiceCapability.RPC(type=rpc_type))
+            for rpc_type in _CONTROLLER_RPC_TYPES
+        ]
+        self._capabilities_response = ControllerGetCapabilitiesResponse(capabilities=capabilities)
 
         logger.info(f"Controller service initialized with {len(self.clients)} clusters")
 
+    @staticmethod
+    def _warm_up(region: str, client: ProxmoxClient) -> None:
+        """Make a first API call to a cluster, logging rather than raising"""
+        try:
+            nodes = client.get_nodes()
+            logger.info(f"Connected to cluster {region}: {len(nodes)} nodes")
+        except Exception as e:
+            logger.warning(f"Initial connection to cluster {region} failed: {e}")
+
+    @contextmanager
+    def _volume_lock(self, volume_id: str) -> Iterator[None]:
+        """
+        Serialize Proxmox changes for one volume
+
+        Retried RPCs for the same volume wait for the first one and then
+        take the cheap already-attached path instead of racing it. The lock
+        is dropped once nobody holds or waits for it.
+
+        Args:
+            volume_id: Volume ID
+        """
+        with self._volume_locks_lock:
+            entry = self._volume_locks.setdefault(volume_id, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._volume_locks_lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._volume_locks[volume_id]
+
+    @staticmethod
+    def _fresh_snapshot(client: ProxmoxClient) -> ClusterState:
+        """
+        Sweep the cluster, bypassing the client's cached snapshot
+
+        Attachments made outside this process within the cache TTL would
+        be missing from a cached snapshot; checks that guard a change must
+        see them. Call under the volume's lock.
+        """
+        client.invalidate_cache('snapshot_cluster')
+        return client.snapshot_cluster()
+
     def _get_default_region(self) -> str:
         """Get default region (first configured region)"""
-        if not self.clients:
-            return ""
-        return next(iter(self.clients.keys()))
+        return self._default_region
 
+    @blocking_rpc
     def CreateVolume(self, request, context):
         """Create volume"""
         name = request.name
@@ -67,7 +143,7 @@ class ControllerService(ControllerServicer):
             context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Name must be provided")
 
         logger.info(f"CreateVolume: {name}")
-        logger.debug(f"CreateVolume request: name={name}, parameters={dict(request.parameters or {})}")
+        logger.debug("CreateVolume request: name=%s, parameters=%s", name, request.parameters)
 
         # Get size
         capacity_range = request.capacity_range
@@ -76,7 +152,7 @@ class ControllerService(ControllerServicer):
         else:
             size_bytes = DEFAULT_VOLUME_SIZE
 
-        logger.debug(f"CreateVolume: size_bytes={size_bytes}, capacity_range={capacity_range}")
+        logger.debug("CreateVolume: size_bytes=%s, capacity_range=%s", size_bytes, capacity_range)
 
         # Get parameters
         params = request.parameters or {}
@@ -84,11 +160,13 @@ class ControllerService(ControllerServicer):
         if not storage:
             context.abort(grpc.StatusCode.INVALID_ARGUMENT, "storage parameter required")
 
-        logger.debug(f"CreateVolume: storage={storage}, all_params={params}")
+        logger.debug("CreateVolume: storage=%s, all_params=%s", storage, params)
 
         # Get region/zone from topology (simplified - use first cluster/node)
-        region = list(self.clients.keys())[0]
-        client = self.clients[region]
+        region, client = self._default_region, self._default_client
+        if client is None:
+            context.abort(grpc.StatusCode.INTERNAL, "No clusters configured")
+        # Node list is cached by the client (nodes_cache_ttl)
         nodes = client.get_nodes()
         if not nodes:
             context.abort(grpc.StatusCode.INTERNAL, "No nodes available")
@@ -96,7 +174,12 @@ class ControllerService(ControllerServicer):
 
         # Create new volume
         logger.info(f"CreateVolume: creating new volume on storage={storage}, size={size_bytes}")
-        volume_id = create_volume(client, region, zone, storage, name, size_bytes)
+        try:
+            volume_id = create_volume(client, region, zone, storage, name, size_bytes)
+        except Exception:
+            # The cached node may have left the cluster; re-read next time
+            client.invalidate_cache('get_nodes')
+            raise
 
         # Return volume
         volume = Volume(
@@ -107,6 +190,7 @@ class ControllerService(ControllerServicer):
         logger.info(f"Volume created: {volume_id}")
         return CreateVolumeResponse(volume=volume)
 
+    @blocking_rpc
     def DeleteVolume(self, request, context):
         """Delete volume"""
         volume_id = request.volume_id
@@ -130,6 +214,7 @@ class ControllerService(ControllerServicer):
             logger.error(f"DeleteVolume failed: {e}", exc_info=True)
             context.abort(grpc.StatusCode.INTERNAL, str(e))
 
+    @blocking_rpc
     def ControllerPublishVolume(self, request, context):
         """Attach volume to node"""
         volume_id = request.volume_id
@@ -146,55 +231,62 @@ class ControllerService(ControllerServicer):
             if not client:
                 context.abort(grpc.StatusCode.NOT_FOUND, f"Region {region} not found")
 
-            # Discover VMID from node_id (Kubernetes node name)
-            logger.debug(f"ControllerPublishVolume: discovering VM ID for node {node_id}")
-
-            # Try to parse as integer first (for explicit VMID)
-            try:
-                vmid = int(node_id)
-                logger.info(f"ControllerPublishVolume: using explicit VMID {vmid}")
-            except ValueError:
-                # Node name provided, discover VM from Proxmox
-                vm_info = client.find_vm_by_name(node_id)
-                if vm_info is None:
-                    context.abort(
-                        grpc.StatusCode.NOT_FOUND,
-                        f"No VM found with name '{node_id}' in Proxmox cluster"
-                    )
-                vmid, vm_node = vm_info
-                logger.info(f"ControllerPublishVolume: discovered VM {vmid} on node {vm_node} for Kubernetes node {node_id}")
-
-            # CRITICAL: Split-brain protection
-            existing_vmid, existing_lun = check_existing_attachments(client, region, storage, disk)
-
-            if existing_vmid is not None:
-                if existing_vmid == vmid:
-                    # Already attached to this VM (idempotent)
-                    logger.info(f"Volume {volume_id} already attached to VM {vmid}")
-                    wwn = f"{existing_lun:02d}".encode('utf-8').hex()
-                    return ControllerPublishVolumeResponse(
-                        publish_context={
-                            'DevicePath': f'/dev/disk/by-id/wwn-0x{wwn}',
-                            'lun': str(existing_lun)
-                        }
-                    )
-                else:
-                    # Attached to different VM - SPLIT-BRAIN PROTECTION
-                    context.abort(
-                        grpc.StatusCode.FAILED_PRECONDITION,
-                        f"Volume {volume_id} already attached to VM {existing_vmid}"
-                    )
+            # Retried publishes for this volume wait here, then find it attached
+            with self._volume_lock(volume_id):
+                # Discover VMID from node_id (Kubernetes node name)
+                logger.debug("ControllerPublishVolume: discovering VM ID for node %s", node_id)
 
-            # Attach volume
-            publish_context = attach_volume(client, vmid, volume_id, self._get_default_region())
+                # One uncached cluster sweep answers the name lookup, split-brain
+                # check and attach
+                state = self._fresh_snapshot(client)
 
-            logger.info(f"Volume {volume_id} attached to VM {vmid}")
-            return ControllerPublishVolumeResponse(publish_context=publish_context)
+                # Try to parse as integer first (for explicit VMID)
+                try:
+                    vmid = int(node_id)
+                    logger.info(f"ControllerPublishVolume: using explicit VMID {vmid}")
+                except ValueError:
+                    # Node name provided, discover VM from Proxmox
+                    vm_info = state.find_vm_by_name(node_id)
+                    if vm_info is None:
+                        context.abort(
+                            grpc.StatusCode.NOT_FOUND,
+                            f"No VM found with name '{node_id}' in Proxmox cluster"
+                        )
+                    vmid, vm_node = vm_info
+                    logger.info(f"ControllerPublishVolume: discovered VM {vmid} on node {vm_node} for Kubernetes node {node_id}")
+
+                # CRITICAL: Split-brain protection
+                existing_vmid, existing_lun = check_existing_attachments(client, region, storage, disk, state)
+
+                if existing_vmid is not None:
+                    if existing_vmid == vmid:
+                        # Already attached to this VM (idempotent)
+                        logger.info(f"Volume {volume_id} already attached to VM {vmid}")
+                        wwn = calculate_wwn(existing_lun)
+                        return ControllerPublishVolumeResponse(
+                            publish_context={
+                                'DevicePath': f'/dev/disk/by-id/wwn-0x{wwn}',
+                                'lun': str(existing_lun)
+                            }
+                        )
+                    else:
+                        # Attached to different VM - SPLIT-BRAIN PROTECTION
+                        context.abort(
+                            grpc.StatusCode.FAILED_PRECONDITION,
+                            f"Volume {volume_id} already attached to VM {existing_vmid}"
+                        )
+
+                # Attach volume
+                publish_context = attach_volume(client, vmid, volume_id, self._get_default_region(), state=state)
+
+                logger.info(f"Volume {volume_id} attached to VM {vmid}")
+                return ControllerPublishVolumeResponse(publish_context=publish_context)
 
         except Exception as e:
             logger.error(f"ControllerPublishVolume failed: {e}", exc_info=True)
             context.abort(grpc.StatusCode.INTERNAL, str(e))
 
+    @blocking_rpc
     def ControllerUnpublishVolume(self, request, context):
         """Detach volume from node"""
         volume_id = request.volume_id
@@ -211,40 +303,47 @@ class ControllerService(ControllerServicer):
             if not client:
                 context.abort(grpc.StatusCode.NOT_FOUND, f"Region {region} not found")
 
-            # Discover VMID from node_id (Kubernetes node name)
-            if not node_id:
-                # If node_id not provided, search for which VM has the volume attached
-                logger.warning(f"ControllerUnpublishVolume: no node_id provided, searching for attachment")
-                existing_vmid, _ = check_existing_attachments(client, region, storage, disk)
-                if existing_vmid is None:
-                    logger.info(f"ControllerUnpublishVolume: volume {volume_id} not attached anywhere")
-                    return ControllerUnpublishVolumeResponse()
-                vmid = existing_vmid
-            else:
-                logger.debug(f"ControllerUnpublishVolume: discovering VM ID for node {node_id}")
-                try:
-                    vmid = int(node_id)
-                    logger.info(f"ControllerUnpublishVolume: using explicit VMID {vmid}")
-                except ValueError:
-                    vm_info = client.find_vm_by_name(node_id)
-                    if vm_info is None:
-                        # For unpublish, if VM not found, it's likely already deleted
-                        # This is idempotent, so just return success
-                        logger.warning(f"ControllerUnpublishVolume: VM '{node_id}' not found, assuming already detached")
+            with self._volume_lock(volume_id):
+                # Only a search for the attachment needs a full cluster sweep;
+                # a known VM is located from the cluster VM listing
+                state = None
+
+                # Discover VMID from node_id (Kubernetes node name)
+                if not node_id:
+                    # If node_id not provided, search for which VM has the volume attached
+                    logger.warning(f"ControllerUnpublishVolume: no node_id provided, searching for attachment")
+                    state = self._fresh_snapshot(client)
+                    existing_vmid, _ = check_existing_attachments(client, region, storage, disk, state)
+                    if existing_vmid is None:
+                        logger.info(f"ControllerUnpublishVolume: volume {volume_id} not attached anywhere")
                         return ControllerUnpublishVolumeResponse()
-                    vmid, vm_node = vm_info
-                    logger.info(f"ControllerUnpublishVolume: discovered VM {vmid} on node {vm_node}")
-
-            # Detach volume
-            detach_volume(client, vmid, volume_id, self._get_default_region())
-
-            logger.info(f"Volume {volume_id} detached from VM {vmid}")
-            return ControllerUnpublishVolumeResponse()
+                    vmid = existing_vmid
+                else:
+                    logger.debug("ControllerUnpublishVolume: discovering VM ID for node %s", node_id)
+                    try:
+                        vmid = int(node_id)
+                        logger.info(f"ControllerUnpublishVolume: using explicit VMID {vmid}")
+                    except ValueError:
+                        vm_info = client.find_vm_by_name(node_id)
+                        if vm_info is None:
+                            # For unpublish, if VM not found, it's likely already deleted
+                            # This is idempotent, so just return success
+                            logger.warning(f"ControllerUnpublishVolume: VM '{node_id}' not found, assuming already detached")
+                            return ControllerUnpublishVolumeResponse()
+                        vmid, vm_node = vm_info
+                        logger.info(f"ControllerUnpublishVolume: discovered VM {vmid} on node {vm_node}")
+
+                # Detach volume
+                detach_volume(client, vmid, volume_id, self._get_default_region(), state=state)
+
+                logger.info(f"Volume {volume_id} detached from VM {vmid}")
+                return ControllerUnpublishVolumeResponse()
 
         except Exception as e:
             logger.error(f"ControllerUnpublishVolume failed: {e}", exc_info=True)
             context.abort(grpc.StatusCode.INTERNAL, str(e))
 
+    @blocking_rpc
     def ControllerExpandVolume(self, request, context):
         """Expand volume"""
         volume_id = request.volume_id
@@ -265,48 +364,33 @@ class ControllerService(ControllerServicer):
             if not client:
                 context.abort(grpc.StatusCode.NOT_FOUND, f"Region {region} not found")
 
-            # For expansion, volume must be attached. Find which VM it's attached to.
-            logger.debug(f"ControllerExpandVolume: finding which VM has volume {volume_id} attached")
-            existing_vmid, _ = check_existing_attachments(client, region, storage, disk)
-            if existing_vmid is None:
-                context.abort(
-                    grpc.StatusCode.FAILED_PRECONDITION,
-                    f"Volume {volume_id} must be attached to a VM to expand"
-                )
+            with self._volume_lock(volume_id):
+                # For expansion, volume must be attached. Find which VM it's attached to.
+                logger.debug("ControllerExpandVolume: finding which VM has volume %s attached", volume_id)
+                state = self._fresh_snapshot(client)
+                existing_vmid, _ = check_existing_attachments(client, region, storage, disk, state)
+                if existing_vmid is None:
+                    context.abort(
+                        grpc.StatusCode.FAILED_PRECONDITION,
+                        f"Volume {volume_id} must be attached to a VM to expand"
+                    )
 
-            logger.info(f"ControllerExpandVolume: volume attached to VM {existing_vmid}")
-            expand_volume(client, existing_vmid, volume_id, new_size, self._get_default_region())
+                logger.info(f"ControllerExpandVolume: volume attached to VM {existing_vmid}")
+                expand_volume(client, existing_vmid, volume_id, new_size, self._get_default_region(),
+                              state=state)
 
-            logger.info(f"Volume {volume_id} expanded to {new_size} bytes")
-            return ControllerExpandVolumeResponse(
-                capacity_bytes=new_size,
-                node_expansion_required=True
-            )
+                logger.info(f"Volume {volume_id} expanded to {new_size} bytes")
+                return ControllerExpandVolumeResponse(
+                    capacity_bytes=new_size,
+                    node_expansion_required=True
+                )
 
         except Exception as e:
             logger.error(f"ControllerExpandVolume failed: {e}", exc_info=True)
             context.abort(grpc.StatusCode.INTERNAL, str(e))
 
-    def ControllerGetCapabilities(self, request, context):
+    async def ControllerGetCapabilities(self, request, context):
         """Return controller capabilities"""
         logger.debug("ControllerGetCapabilities called")
 
-        capabilities = [
-            ControllerServiceCapability(
-                rpc=ControllerServiceCapability.RPC(
-                    type=ControllerServiceCapability.RPC.CREATE_DELETE_VOLUME
-                )
-            ),
-            ControllerServiceCapability(
-                rpc=ControllerServiceCapability.RPC(
-                    type=ControllerServiceCapability.RPC.PUBLISH_UNPUBLISH_VOLUME
-                )
-            ),
-            ControllerServiceCapability(
-                rpc=ControllerServiceCapability.RPC(
-                    type=ControllerServiceCapability.RPC.EXPAND_VOLUME
-                )
-            ),
-        ]
-
-        return ControllerGetCapabilitiesResponse(capabilities=capabilities)
+        return self._capabilities_response
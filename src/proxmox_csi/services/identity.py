@@ -19,29 +19,13 @@ logger = logging.getLogger(__name__)
 class IdentityService(IdentityServicer):
     """CSI Identity Server"""
 
-    def GetPluginInfo(self, request, context):
-        """
-        Return plugin information
-
-        Returns driver name and version
-        """
-        logger.debug("GetPluginInfo called")
-
-        return GetPluginInfoResponse(
+    def __init__(self):
+        # Responses never change, build them once and share them read-only
+        self._info_response = GetPluginInfoResponse(
             name=DRIVER_NAME,
             vendor_version=DRIVER_VERSION
         )
 
-    def GetPluginCapabilities(self, request, context):
-        """
-        Return plugin capabilities
-
-        Advertises:
-        - CONTROLLER_SERVICE
-        - VOLUME_ACCESSIBILITY_CONSTRAINTS
-        """
-        logger.debug("GetPluginCapabilities called")
-
         capabilities = [
             PluginCapability(
                 service=PluginCapability.Service(
@@ -54,10 +38,32 @@ class IdentityService(IdentityServicer):
                 )
             )
         ]
+        self._capabilities_response = GetPluginCapabilitiesResponse(capabilities=capabilities)
+        self._probe_response = ProbeResponse(ready=BoolValue(value=True))
+
+    async def GetPluginInfo(self, request, context):
+        """
+        Return plugin information
+
+        Returns driver name and version
+        """
+        logger.debug("GetPluginInfo called")
+
+        return self._info_response
+
+    async def GetPluginCapabilities(self, request, context):
+        """
+        Return plugin capabilities
+
+        Advertises:
+        - CONTROLLER_SERVICE
+        - VOLUME_ACCESSIBILITY_CONSTRAINTS
+        """
+        logger.debug("GetPluginCapabilities called")
 
-        return GetPluginCapabilitiesResponse(capabilities=capabilities)
+        return self._capabilities_response
 
-    def Probe(self, request, context):
+    async def Probe(self, request, context):
         """
         Health check
 
@@ -65,4 +71,4 @@ class IdentityService(IdentityServicer):
         """
         logger.debug("Probe called")
 
-        return ProbeResponse(ready=BoolValue(value=True))
+        return self._probe_response
@@ -3,7 +3,6 @@ CSI Node Service Implementation
 """
 import logging
 import grpc
-import os
 from ..csi_pb2 import (
     NodeStageVolumeResponse,
     NodeUnstageVolumeResponse,
@@ -17,10 +16,12 @@ from ..csi_pb2 import (
     VolumeCapability
 )
 from ..csi_pb2_grpc import NodeServicer
+from .aio import blocking_rpc
 from ..device.discovery import discover_device_by_wwn, get_device_from_mount
-from ..filesystem.format import format_device, check_filesystem
+from ..filesystem.format import format_device
 from ..filesystem.mount import mount_device, unmount_path, bind_mount, is_mounted
-from ..filesystem.resize import resize_filesystem, get_filesystem_type
+from ..filesystem.resize import resize_filesystem, get_filesystem_type, forget_filesystem_type
+from ..filesystem.stats import get_volume_stats
 from ..constants import (
     DRIVER_NAME,
     MAX_VOLUMES_PER_NODE,
@@ -30,14 +31,34 @@ from ..constants import (
 
 logger = logging.getLogger(__name__)
 
+# RPCs advertised by GetCapabilities
+_NODE_RPC_TYPES = (
+    NodeServiceCapability.RPC.STAGE_UNSTAGE_VOLUME,
+    NodeServiceCapability.RPC.EXPAND_VOLUME,
+    NodeServiceCapability.RPC.GET_VOLUME_STATS,
+)
+
 
 class NodeService(NodeServicer):
     """CSI Node Server"""
 
     def __init__(self, node_name: str):
         self.node_name = node_name
+
+        # Responses never change, build them once and share them read-only
+        capabilities = [
+            NodeServiceCapability(rpc=NodeServiceCapability.RPC(type=rpc_type))
+            for rpc_type in _NODE_RPC_TYPES
+        ]
+        self._capabilities_response = NodeGetCapabilitiesResponse(capabilities=capabilities)
+        self._info_response = NodeGetInfoResponse(
+            node_id=node_name,
+            max_volumes_per_node=MAX_VOLUMES_PER_NODE
+        )
+
         logger.info(f"Node service initialized for node: {node_name}")
 
+    @blocking_rpc
     def NodeStageVolume(self, request, context):
         """Stage volume (format and mount to staging path)"""
         volume_id = request.volume_id
@@ -64,7 +85,7 @@ class NodeService(NodeServicer):
                 context.abort(grpc.StatusCode.INVALID_ARGUMENT, "DevicePath not provided")
 
             # Extract WWN hex string
-            wwn = device_path_wwn.split('wwn-0x')[1] if 'wwn-0x' in device_path_wwn else ''
+            wwn = device_path_wwn.partition('wwn-0x')[2]
             if not wwn:
                 context.abort(grpc.StatusCode.INVALID_ARGUMENT, "Invalid DevicePath format")
 
@@ -78,12 +99,8 @@ class NodeService(NodeServicer):
                 if volume_capability.mount.fs_type:
                     fstype = volume_capability.mount.fs_type
 
-            # Check if already formatted
-            existing_fs = check_filesystem(device_path)
-            if not existing_fs:
-                # Format device
-                format_device(device_path, fstype)
-                logger.info(f"Device {device_path} formatted as {fstype}")
+            # Format device (no-op if already formatted as fstype)
+            format_device(device_path, fstype)
 
             # Mount to staging path
             if not is_mounted(staging_path):
@@ -97,6 +114,7 @@ class NodeService(NodeServicer):
             logger.error(f"NodeStageVolume failed: {e}")
             context.abort(grpc.StatusCode.INTERNAL, str(e))
 
+    @blocking_rpc
     def NodeUnstageVolume(self, request, context):
         """Unstage volume (unmount from staging path)"""
         volume_id = request.volume_id
@@ -114,9 +132,11 @@ class NodeService(NodeServicer):
                 logger.info("Raw block device, skipping unstaging")
                 return NodeUnstageVolumeResponse()
 
-            # Unmount
-            if is_mounted(staging_path):
-                unmount_path(staging_path)
+            # Unmount; the mount table lookup also tells whether it is mounted
+            device_path = get_device_from_mount(staging_path)
+            if device_path is not None:
+                unmount_path(staging_path, trim=True)
+                forget_filesystem_type(device_path)
                 logger.info(f"Path {staging_path} unmounted")
 
             logger.info(f"NodeUnstageVolume completed for {volume_id}")
@@ -126,6 +146,7 @@ class NodeService(NodeServicer):
             logger.error(f"NodeUnstageVolume failed: {e}")
             context.abort(grpc.StatusCode.INTERNAL, str(e))
 
+    @blocking_rpc
     def NodePublishVolume(self, request, context):
         """Publish volume (bind mount to pod path)"""
         volume_id = request.volume_id
@@ -147,7 +168,7 @@ class NodeService(NodeServicer):
                 # Raw block - bind mount device directly
                 publish_context = request.publish_context
                 device_path_wwn = publish_context.get('DevicePath', '')
-                wwn = device_path_wwn.split('wwn-0x')[1] if 'wwn-0x' in device_path_wwn else ''
+                wwn = device_path_wwn.partition('wwn-0x')[2]
                 device_path = discover_device_by_wwn(wwn)
 
                 logger.info(f"Binding raw block device {device_path} to {target_path}")
@@ -168,6 +189,7 @@ class NodeService(NodeServicer):
             logger.error(f"NodePublishVolume failed: {e}")
             context.abort(grpc.StatusCode.INTERNAL, str(e))
 
+    @blocking_rpc
     def NodeUnpublishVolume(self, request, context):
         """Unpublish volume (unmount from pod path)"""
         volume_id = request.volume_id
@@ -191,6 +213,7 @@ class NodeService(NodeServicer):
             logger.error(f"NodeUnpublishVolume failed: {e}")
             context.abort(grpc.StatusCode.INTERNAL, str(e))
 
+    @blocking_rpc
     def NodeExpandVolume(self, request, context):
         """Expand filesystem on node"""
         volume_id = request.volume_id
@@ -229,57 +252,30 @@ class NodeService(NodeServicer):
             logger.error(f"NodeExpandVolume failed: {e}")
             context.abort(grpc.StatusCode.INTERNAL, str(e))
 
-    def NodeGetCapabilities(self, request, context):
+    async def NodeGetCapabilities(self, request, context):
         """Return node capabilities"""
         logger.debug("NodeGetCapabilities called")
 
-        capabilities = [
-            NodeServiceCapability(
-                rpc=NodeServiceCapability.RPC(
-                    type=NodeServiceCapability.RPC.STAGE_UNSTAGE_VOLUME
-                )
-            ),
-            NodeServiceCapability(
-                rpc=NodeServiceCapability.RPC(
-                    type=NodeServiceCapability.RPC.EXPAND_VOLUME
-                )
-            ),
-            NodeServiceCapability(
-                rpc=NodeServiceCapability.RPC(
-                    type=NodeServiceCapability.RPC.GET_VOLUME_STATS
-                )
-            ),
-        ]
+        return self._capabilities_response
 
-        return NodeGetCapabilitiesResponse(capabilities=capabilities)
-
-    def NodeGetInfo(self, request, context):
+    async def NodeGetInfo(self, request, context):
         """Return node information"""
-        logger.debug(f"NodeGetInfo called for {self.node_name}")
+        logger.debug("NodeGetInfo called for %s", self.node_name)
 
-        return NodeGetInfoResponse(
-            node_id=self.node_name,
-            max_volumes_per_node=MAX_VOLUMES_PER_NODE
-        )
+        return self._info_response
 
+    @blocking_rpc
     def NodeGetVolumeStats(self, request, context):
         """Return volume statistics"""
         volume_id = request.volume_id
         volume_path = request.volume_path
 
-        logger.debug(f"NodeGetVolumeStats: {volume_id} at {volume_path}")
+        logger.debug("NodeGetVolumeStats: %s at %s", volume_id, volume_path)
 
         try:
             # Get filesystem stats
-            stat = os.statvfs(volume_path)
-
-            total_bytes = stat.f_blocks * stat.f_frsize
-            available_bytes = stat.f_bavail * stat.f_frsize
-            used_bytes = total_bytes - available_bytes
-
-            total_inodes = stat.f_files
-            available_inodes = stat.f_favail
-            used_inodes = total_inodes - available_inodes
+            (total_bytes, used_bytes, available_bytes,
+             total_inodes, used_inodes, available_inodes) = get_volume_stats(volume_path)
 
             return NodeGetVolumeStatsResponse(
                 usage=[
@@ -2,15 +2,27 @@
 Helper utilities
 """
 import time
+import random
 import logging
 from typing import Callable, TypeVar, Any
-from functools import wraps
+from functools import lru_cache, wraps
 
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+# Size suffixes and their multipliers, all single-letter
+_SIZE_UNITS = {
+    'T': 1024 ** 4,
+    'G': 1024 ** 3,
+    'M': 1024 ** 2,
+    'K': 1024,
+}
+
+# Labels for format_size, one per power of 1024
+_SIZE_LABELS = ('B', 'KiB', 'MiB', 'GiB', 'TiB')
+
 
 def bytes_to_gib(size_bytes: int) -> float:
     """
@@ -38,6 +50,7 @@ def gib_to_bytes(size_gib: float) -> int:
     return int(size_gib * (1024 ** 3))
 
 
+@lru_cache(maxsize=256)
 def parse_size_string(size_str: str) -> int:
     """
     Parse size string to bytes
@@ -53,20 +66,13 @@ def parse_size_string(size_str: str) -> int:
     """
     size_str = size_str.strip().upper()
 
-    units = {
-        'K': 1024,
-        'M': 1024 ** 2,
-        'G': 1024 ** 3,
-        'T': 1024 ** 4,
-    }
-
-    for unit, multiplier in units.items():
-        if size_str.endswith(unit):
-            try:
-                value = float(size_str[:-1])
-                return int(value * multiplier)
-            except ValueError:
-                raise ValueError(f"Invalid size format: {size_str}")
+    multiplier = _SIZE_UNITS.get(size_str[-1:])
+    if multiplier is not None:
+        try:
+            value = float(size_str[:-1])
+            return int(value * multiplier)
+        except ValueError:
+            raise ValueError(f"Invalid size format: {size_str}")
 
     # Try to parse as plain bytes
     try:
@@ -85,22 +91,23 @@ def format_size(size_bytes: int) -> str:
     Returns:
         Human-readable size string
     """
-    units = ['B', 'KiB', 'MiB', 'GiB', 'TiB']
-    size = float(size_bytes)
-    unit_idx = 0
+    if size_bytes < 1024:
+        return f"{size_bytes:.2f} B"
 
-    while size >= 1024 and unit_idx < len(units) - 1:
-        size /= 1024
-        unit_idx += 1
+    # Every 10 bits is one more factor of 1024
+    unit_idx = min((int(size_bytes).bit_length() - 1) // 10, len(_SIZE_LABELS) - 1)
+    size = size_bytes / (1 << (10 * unit_idx))
 
-    return f"{size:.2f} {units[unit_idx]}"
+    return f"{size:.2f} {_SIZE_LABELS[unit_idx]}"
 
 
 def retry_on_error(
     max_attempts: int = 3,
     delay: float = 1.0,
     backoff: float = 2.0,
-    exceptions: tuple = (Exception,)
+    exceptions: tuple = (Exception,),
+    non_retryable: tuple = (),
+    jitter: float = 0.1
 ) -> Callable:
     """
     Decorator to retry function on error
@@ -110,6 +117,10 @@ def retry_on_error(
         delay: Initial delay between attempts (seconds)
         backoff: Backoff multiplier for delay
         exceptions: Tuple of exception types to catch
+        non_retryable: Tuple of exception types to re-raise immediately,
+            even if they are also listed in exceptions
+        jitter: Fraction by which each delay is randomly varied, so
+            callers failing together do not retry in lockstep
 
     Returns:
         Decorated function
@@ -123,14 +134,17 @@ def retry_on_error(
             for attempt in range(max_attempts):
                 try:
                     return func(*args, **kwargs)
+                except non_retryable:
+                    raise
                 except exceptions as e:
                     last_exception = e
                     if attempt < max_attempts - 1:
+                        sleep_for = current_delay * (1 + jitter * (2 * random.random() - 1))
                         logger.warning(
                             f"{func.__name__} attempt {attempt + 1}/{max_attempts} failed: {e}. "
-                            f"Retrying in {current_delay}s..."
+                            f"Retrying in {sleep_for:.2f}s..."
                         )
-                        time.sleep(current_delay)
+                        time.sleep(sleep_for)
                         current_delay *= backoff
                     else:
                         logger.error(f"{func.__name__} failed after {max_attempts} attempts")
@@ -1,38 +1,54 @@
 """
 Volume ID parsing and generation
 
-Volume ID format: region/zone/storage/disk-name
-Example: cluster-1/pve-1/alletra-vg/vm-9999-pvc-abc123
+Volume ID formats:
+    /storage/disk-name (region and zone from the driver)
+    Example: /kubedata/vm-9999-static-test
+
+    region/zone/storage/disk-name (as returned by CreateVolume)
+    Example: cluster-1/pve-1/alletra-vg/vm-9999-pvc-abc123
 """
-from typing import Tuple
+import sys
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
 from ..constants import VOLUME_ID_SEPARATOR, VOLUME_ID_PARTS
 
 
 class VolumeID:
     """Volume ID handler"""
 
+    __slots__ = ('region', 'zone', 'storage', 'disk')
+
+    region: str
+    zone: str
+    storage: str
+    disk: str
+
     def __init__(self, region: str, zone: str, storage: str, disk: str):
-        self.region = region
-        self.zone = zone
-        self.storage = storage
+        # A handful of distinct values shared by every volume; the disk
+        # name is unique per PVC and is left alone
+        self.region = sys.intern(region)
+        self.zone = sys.intern(zone)
+        self.storage = sys.intern(storage)
         self.disk = disk
 
     def __str__(self) -> str:
         """Return volume ID string"""
-        return f"{self.region}{VOLUME_ID_SEPARATOR}{self.zone}{VOLUME_ID_SEPARATOR}{self.storage}{VOLUME_ID_SEPARATOR}{self.disk}"
+        return VOLUME_ID_SEPARATOR.join((self.region, self.zone, self.storage, self.disk))
 
     @classmethod
     def from_string(cls, volume_id: str, default_region: str = "", default_zone: str = "") -> 'VolumeID':
         """
         Parse volume ID from string
 
-        Format: /storage/disk
+        Format: /storage/disk or region/zone/storage/disk
         Example: /kubedata/vm-9999-static-test
 
         Args:
-            volume_id: Volume ID string starting with /
-            default_region: Region to use (from driver config)
-            default_zone: Zone to use (can be empty, will be determined dynamically)
+            volume_id: Volume ID string
+            default_region: Region to use for /storage/disk IDs (from driver config)
+            default_zone: Zone to use for /storage/disk IDs (can be empty,
+                will be determined dynamically)
 
         Returns:
             VolumeID object
@@ -40,20 +56,24 @@ class VolumeID:
         Raises:
             ValueError: If volume ID format is invalid
         """
-        if not volume_id.startswith('/'):
-            raise ValueError(f"Invalid volume ID format: {volume_id}, must start with /")
+        return cls(*_parse_volume_id(volume_id, default_region, default_zone))
 
-        parts = volume_id[1:].split(VOLUME_ID_SEPARATOR)
+    @classmethod
+    def try_parse(cls, volume_id: str, default_region: str = "",
+                  default_zone: str = "") -> Optional['VolumeID']:
+        """
+        Parse volume ID from string without raising
 
-        if len(parts) != 2:
-            raise ValueError(f"Invalid volume ID format: {volume_id}, expected /storage/disk")
+        Args:
+            volume_id: Volume ID string
+            default_region: Region to use for /storage/disk IDs (from driver config)
+            default_zone: Zone to use for /storage/disk IDs
 
-        return cls(
-            region=default_region,
-            zone=default_zone,
-            storage=parts[0],
-            disk=parts[1]
-        )
+        Returns:
+            VolumeID object, or None if the format is invalid
+        """
+        parts = _split_volume_id(volume_id, default_region, default_zone)
+        return cls(*parts) if parts is not None else None
 
     @classmethod
     def create(cls, region: str, zone: str, storage: str, pvc_name: str, vmid: int = 9999) -> 'VolumeID':
@@ -70,7 +90,7 @@ class VolumeID:
         Returns:
             VolumeID object
         """
-        disk_name = f"vm-{vmid}-{pvc_name}"
+        disk_name = _disk_prefix(vmid) + pvc_name
         return cls(region=region, zone=zone, storage=storage, disk=disk_name)
 
     def to_tuple(self) -> Tuple[str, str, str, str]:
@@ -78,23 +98,85 @@ class VolumeID:
         return (self.region, self.zone, self.storage, self.disk)
 
 
+@lru_cache(maxsize=16)
+def _disk_prefix(vmid: int) -> str:
+    """Disk name prefix for a VM ID, e.g. 'vm-9999-' (few distinct VM IDs are used)"""
+    return f"vm-{vmid}-"
+
+
+@lru_cache(maxsize=4096)
+def _split_volume_id(volume_id: str, default_region: str,
+                     default_zone: str) -> Optional[Tuple[str, str, str, str]]:
+    """
+    Split a volume ID into (region, zone, storage, disk), or None if invalid
+
+    Results are cached, since the sidecars send the same IDs again on
+    every retry.
+    """
+    sep = VOLUME_ID_SEPARATOR
+    if not volume_id.startswith(sep):
+        # region/zone/storage/disk, as built by create_volume_id
+        parts = volume_id.split(sep, VOLUME_ID_PARTS)
+        if len(parts) != VOLUME_ID_PARTS:
+            return None
+        region, zone, storage, disk = parts
+        return sys.intern(region), sys.intern(zone), sys.intern(storage), disk
+
+    # Exactly one more separator, between storage and disk
+    if volume_id.count(sep, 1) != 1:
+        return None
+
+    split = volume_id.index(sep, 1)
+    return default_region, default_zone, sys.intern(volume_id[1:split]), volume_id[split + 1:]
+
+
+def _parse_volume_id(volume_id: str, default_region: str, default_zone: str) -> Tuple[str, str, str, str]:
+    """Split a volume ID into (region, zone, storage, disk), raising ValueError if invalid"""
+    parts = _split_volume_id(volume_id, default_region, default_zone)
+    if parts is None:
+        if volume_id.startswith(VOLUME_ID_SEPARATOR):
+            raise ValueError(f"Invalid volume ID format: {volume_id}, expected /storage/disk")
+        raise ValueError(
+            f"Invalid volume ID format: {volume_id}, expected /storage/disk or region/zone/storage/disk"
+        )
+    return parts
+
+
 def parse_volume_id(volume_id: str, default_region: str = "", default_zone: str = "") -> Tuple[str, str, str, str]:
     """
     Parse volume ID string into components
 
-    Format: /storage/disk
+    Format: /storage/disk or region/zone/storage/disk
     Example: /kubedata/vm-9999-static-test
 
     Args:
-        volume_id: Volume ID string starting with /
+        volume_id: Volume ID string
         default_region: Default region if not in volume_id
         default_zone: Default zone if not in volume_id
 
     Returns:
         Tuple of (region, zone, storage, disk)
     """
-    vid = VolumeID.from_string(volume_id, default_region, default_zone)
-    return vid.to_tuple()
+    return _parse_volume_id(volume_id, default_region, default_zone)
+
+
+def parse_volume_ids(volume_ids: Iterable[str], default_region: str = "",
+                     default_zone: str = "") -> List[Tuple[str, str, str, str]]:
+    """
+    Parse many volume ID strings into components
+
+    Args:
+        volume_ids: Volume ID strings
+        default_region: Default region if not in a volume ID
+        default_zone: Default zone if not in a volume ID
+
+    Returns:
+        List of (region, zone, storage, disk) tuples, in input order
+
+    Raises:
+        ValueError: If any volume ID format is invalid
+    """
+    return [_parse_volume_id(volume_id, default_region, default_zone) for volume_id in volume_ids]
 
 
 def create_volume_id(region: str, zone: str, storage: str, pvc_name: str, vmid: int = 9999) -> str: